@@ -21,6 +21,7 @@ from services.export_service import ExportService
 from services.google_sheets_service import GoogleSheetsError
 from services.document_viewer import DocumentViewer
 from utils.logger import get_logger
+from config.settings import config
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -68,7 +69,8 @@ def get_document_processor():
 def get_nlp_analyzer():
     """Initialize and cache NLP analyzer."""
     logger.info("Initializing NLPAnalyzer...")
-    return NLPAnalyzer()
+    # Clause embeddings persist next to the downloaded models across restarts
+    return NLPAnalyzer(cache_dir=config.models.cache_dir)
 
 @st.cache_resource
 def get_compliance_checker():
@@ -430,15 +432,19 @@ with tab1:
             st.subheader("Export Results")
             
             export_service = get_export_service()
+            # One timestamp for every format's payload and filename
+            export_time = datetime.now()
             
             # JSON Export
             try:
                 json_data = export_service.export_to_json(
                     st.session_state.compliance_report,
-                    st.session_state.recommendations
+                    st.session_state.recommendations,
+                    timestamp=export_time
                 )
                 json_filename = export_service.get_json_filename(
-                    st.session_state.compliance_report
+                    st.session_state.compliance_report,
+                    export_time
                 )
                 
                 st.download_button(
@@ -459,7 +465,8 @@ with tab1:
                     st.session_state.recommendations
                 )
                 csv_filename = export_service.get_csv_filename(
-                    st.session_state.compliance_report
+                    st.session_state.compliance_report,
+                    export_time
                 )
                 
                 st.download_button(
@@ -477,10 +484,12 @@ with tab1:
             try:
                 pdf_data = export_service.export_to_pdf(
                     st.session_state.compliance_report,
-                    st.session_state.recommendations
+                    st.session_state.recommendations,
+                    timestamp=export_time
                 )
                 pdf_filename = export_service.get_pdf_filename(
-                    st.session_state.compliance_report
+                    st.session_state.compliance_report,
+                    export_time
                 )
                 
                 st.download_button(
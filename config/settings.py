@@ -16,6 +16,7 @@ class ModelConfig:
     cache_dir: str = "./models_cache"
     use_gpu: bool = True
     max_length: int = 512
+    quantization: str = 'none'  # LLaMA weights on GPU: none, 8bit, 4bit
 
 
 @dataclass
@@ -91,6 +92,7 @@ class AppConfig:
                 'cache_dir': self.models.cache_dir,
                 'use_gpu': self.models.use_gpu,
                 'max_length': self.models.max_length,
+                'quantization': self.models.quantization,
             },
             'processing': {
                 'max_file_size_mb': self.processing.max_file_size_mb,
@@ -134,6 +136,9 @@ class AppConfig:
         if os.getenv('USE_GPU'):
             config.models.use_gpu = os.getenv('USE_GPU').lower() == 'true'
         
+        if os.getenv('LLAMA_QUANTIZATION'):
+            config.models.quantization = os.getenv('LLAMA_QUANTIZATION').lower()
+        
         return config
 
 
@@ -1,11 +1,15 @@
 """Clause data model for contract analysis."""
 
+import sys
 from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
 
+# Instances without a __dict__ are about half the size; slots=True needs 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class Clause:
     """Represents a single clause in a contract."""
     
@@ -1,11 +1,16 @@
 """
 Data models for NLP clause analysis.
 """
+import sys
 from dataclasses import dataclass
 from enum import Enum
 from typing import List, Tuple, Optional
 import numpy as np
 
+# One analysis is kept per clause, so drop the per-instance __dict__
+# (slots=True needs Python 3.10+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 
 class ClauseType(Enum):
     """Enumeration of clause types for classification."""
@@ -19,7 +24,7 @@ class ClauseType(Enum):
     OTHER = "Other"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ClauseAnalysis:
     """Analysis results for a single clause."""
     clause_id: str
@@ -16,6 +16,16 @@ class ActionType(Enum):
     CLARIFY_CLAUSE = "Clarify Clause"
 
 
+# Human-readable labels for priorities 1 (highest) to 5 (lowest)
+PRIORITY_LABELS = {
+    1: "Critical",
+    2: "High",
+    3: "Medium",
+    4: "Low",
+    5: "Optional"
+}
+
+
 @dataclass
 class Recommendation:
     """
@@ -51,11 +61,4 @@ class Recommendation:
     
     def get_priority_label(self) -> str:
         """Get human-readable priority label."""
-        priority_map = {
-            1: "Critical",
-            2: "High",
-            3: "Medium",
-            4: "Low",
-            5: "Optional"
-        }
-        return priority_map.get(self.priority, "Unknown")
+        return PRIORITY_LABELS.get(self.priority, "Unknown")
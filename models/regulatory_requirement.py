@@ -1,8 +1,10 @@
 """
 Data models for regulatory requirements and compliance checking.
 """
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property
 from typing import List, Optional, Dict, Any
 import numpy as np
 
@@ -38,6 +40,25 @@ class RegulatoryRequirement:
     mandatory_elements: List[str] = field(default_factory=list)
     risk_level: RiskLevel = RiskLevel.HIGH
     
+    def __post_init__(self):
+        """Intern the low-cardinality labels used as prompt and cache keys."""
+        self.framework = sys.intern(self.framework)
+        self.article_reference = sys.intern(self.article_reference)
+        self.clause_type = sys.intern(self.clause_type)
+    
+    @cached_property
+    def formatted_mandatory_elements(self) -> str:
+        """
+        Mandatory elements as the bulleted list used in prompts.
+        
+        Built on first access and kept for the life of the requirement;
+        mandatory_elements is not expected to change after loading.
+        """
+        if not self.mandatory_elements:
+            return "None specified"
+        
+        return "\n".join([f"  • {element}" for element in self.mandatory_elements])
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert requirement to dictionary (excluding embeddings)."""
         return {
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Optional, Tuple
 import mimetypes
 
+from config.settings import config
 from models.clause import Clause
 from models.processed_document import ProcessedDocument
 from services.pdf_extractor import PDFExtractor, PDFExtractionError, PasswordProtectedError
@@ -49,7 +50,10 @@ class DocumentProcessor:
         """Lazy initialization of OCR extractor."""
         if self._ocr_extractor is None:
             try:
-                self._ocr_extractor = OCRExtractor(verify_installation=True)
+                self._ocr_extractor = OCRExtractor(
+                    verify_installation=True,
+                    use_gpu=config.models.use_gpu
+                )
             except OCRError as e:
                 self.logger.warning(f"OCR not available: {e}")
                 raise
@@ -1,7 +1,7 @@
 """
 Document viewer service for displaying contracts with visual highlighting.
 """
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterator, Optional, Tuple
 from models.clause import Clause
 from models.processed_document import ProcessedDocument
 
@@ -50,6 +50,31 @@ class DocumentViewer:
         Returns:
             HTML string with highlighted text
         """
+        return ''.join(self._iter_html_fragments(
+            processed_doc, clause_risk_map, clause_details_map
+        ))
+    
+    def _iter_html_fragments(
+        self,
+        processed_doc: ProcessedDocument,
+        clause_risk_map: Dict[str, str],
+        clause_details_map: Optional[Dict[str, Dict]] = None
+    ) -> Iterator[str]:
+        """
+        Yield the highlighted document HTML piece by piece.
+        
+        Callers that can write to a sink (file, socket, chunked component)
+        should iterate this directly instead of calling create_highlighted_html,
+        so very large contracts are never held in memory as a single string.
+        
+        Args:
+            processed_doc: The processed document
+            clause_risk_map: Dictionary mapping clause_id to risk level (High/Medium/Low)
+            clause_details_map: Optional dictionary with clause details for tooltips
+            
+        Yields:
+            HTML fragments that concatenate to the full highlighted document
+        """
         # Get the original text
         text = processed_doc.extracted_text
         
@@ -68,19 +93,37 @@ class DocumentViewer:
         # Sort by start position
         highlights.sort(key=lambda x: x[0])
         
-        # Build HTML with highlights
-        html_parts = []
+        # Open container with styling
+        yield """
+        <div class="document-viewer" style="
+            font-family: 'Georgia', serif;
+            line-height: 1.8;
+            padding: 20px;
+            background-color: #ffffff;
+            border: 1px solid #e0e0e0;
+            border-radius: 8px;
+            max-height: 600px;
+            overflow-y: auto;
+            white-space: pre-wrap;
+            word-wrap: break-word;
+        ">
+            """
+        
+        # Bind loop-invariant lookups once
+        _esc = self._escape_html
+        colors = self.risk_colors
+        text_colors = self.risk_text_colors
         last_pos = 0
         
         for start_pos, end_pos, clause_id, risk_level in highlights:
             # Add text before highlight
             if start_pos > last_pos:
-                html_parts.append(self._escape_html(text[last_pos:start_pos]))
+                yield _esc(text[last_pos:start_pos])
             
             # Add highlighted text
             clause_text = text[start_pos:end_pos]
-            bg_color = self.risk_colors.get(risk_level, "#cccccc")
-            text_color = self.risk_text_colors.get(risk_level, "#000000")
+            bg_color = colors.get(risk_level, "#cccccc")
+            text_color = text_colors.get(risk_level, "#000000")
             
             # Build tooltip content
             tooltip_content = self._build_tooltip_content(
@@ -92,48 +135,33 @@ class DocumentViewer:
             compliance_status = clause_details.get('compliance_status', 'Unknown')
             clause_type = clause_details.get('clause_type', 'Unknown')
             
-            html_parts.append(
+            yield (
                 f'<span class="highlighted-clause tooltip-trigger clickable-clause" '
                 f'data-clause-id="{clause_id}" '
                 f'data-risk-level="{risk_level}" '
-                f'data-compliance-status="{self._escape_html(compliance_status)}" '
-                f'data-clause-type="{self._escape_html(clause_type)}" '
+                f'data-compliance-status="{_esc(compliance_status)}" '
+                f'data-clause-type="{_esc(clause_type)}" '
                 f'style="background-color: {bg_color}; color: {text_color}; '
                 f'padding: 2px 4px; border-radius: 3px; cursor: pointer; '
                 f'transition: all 0.2s; position: relative;" '
                 f'onmouseover="this.style.opacity=\'0.8\'; this.style.transform=\'scale(1.02)\';" '
                 f'onmouseout="this.style.opacity=\'1\'; this.style.transform=\'scale(1)\';" '
                 f'title="Click to view details">'
-                f'{self._escape_html(clause_text)}'
-                f'<span class="tooltip-content">{tooltip_content}</span>'
-                f'</span>'
             )
+            yield _esc(clause_text)
+            yield f'<span class="tooltip-content">{tooltip_content}</span>'
+            yield '</span>'
             
             last_pos = end_pos
         
         # Add remaining text
         if last_pos < len(text):
-            html_parts.append(self._escape_html(text[last_pos:]))
+            yield _esc(text[last_pos:])
         
-        # Wrap in container with styling
-        html = f"""
-        <div class="document-viewer" style="
-            font-family: 'Georgia', serif;
-            line-height: 1.8;
-            padding: 20px;
-            background-color: #ffffff;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            max-height: 600px;
-            overflow-y: auto;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-        ">
-            {''.join(html_parts)}
+        # Close container
+        yield """
         </div>
         """
-        
-        return html
     
     def create_clause_position_map(
         self,
@@ -309,16 +337,17 @@ class DocumentViewer:
         compliance_status = details.get('compliance_status', 'Unknown')
         issues = details.get('issues', [])
         clause_type = details.get('clause_type', 'Unknown')
+        _esc = self._escape_html
         
         tooltip_parts = [
-            f"<strong>Clause Type:</strong> {self._escape_html(clause_type)}<br>",
+            f"<strong>Clause Type:</strong> {_esc(clause_type)}<br>",
             f"<strong>Risk Level:</strong> {risk_level}<br>",
-            f"<strong>Status:</strong> {self._escape_html(compliance_status)}<br>"
+            f"<strong>Status:</strong> {_esc(compliance_status)}<br>"
         ]
         
         if issues:
             issue_text = issues[0] if len(issues) == 1 else f"{len(issues)} issues found"
-            tooltip_parts.append(f"<strong>Issue:</strong> {self._escape_html(issue_text)}<br>")
+            tooltip_parts.append(f"<strong>Issue:</strong> {_esc(issue_text)}<br>")
         
         tooltip_parts.append("<em>Click for full details</em>")
         
@@ -544,6 +573,7 @@ class DocumentViewer:
             key=lambda req: rec_by_req.get(req.requirement_id, type('obj', (), {'priority': 5})).priority
         )
         
+        _esc = self._escape_html
         for req in sorted_requirements:
             req_id = req.requirement_id
             rec = rec_by_req.get(req_id)
@@ -562,19 +592,19 @@ class DocumentViewer:
             
             # Build requirement card
             panel_html.append(
-                f'<div class="missing-clause-card clickable-missing-clause" data-req-id="{self._escape_html(req_id)}" '
+                f'<div class="missing-clause-card clickable-missing-clause" data-req-id="{_esc(req_id)}" '
                 f'style="background-color: white; border: 1px solid #dee2e6; border-radius: 6px; '
                 f'padding: 12px; margin-bottom: 12px; cursor: pointer; '
                 f'transition: all 0.2s ease; position: relative;" '
                 f'onmouseover="this.style.boxShadow=\'0 4px 12px rgba(0,0,0,0.2)\'; this.style.transform=\'translateY(-2px)\';" '
                 f'onmouseout="this.style.boxShadow=\'none\'; this.style.transform=\'translateY(0)\';" '
-                f'onclick="handleMissingClauseClick(\'{self._escape_html(req_id)}\')">'
+                f'onclick="handleMissingClauseClick(\'{_esc(req_id)}\')">'
             )
             
             # Header with priority
             panel_html.append(
                 f'<div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 8px;">'
-                f'<strong style="color: #495057; font-size: 14px;">{self._escape_html(req.clause_type)}</strong>'
+                f'<strong style="color: #495057; font-size: 14px;">{_esc(req.clause_type)}</strong>'
                 f'{priority_badge}'
                 f'</div>'
             )
@@ -582,7 +612,7 @@ class DocumentViewer:
             # Regulatory reference
             panel_html.append(
                 f'<div style="color: #6c757d; font-size: 12px; margin-bottom: 8px;">'
-                f'📋 {self._escape_html(req.article_reference)} ({self._escape_html(req.framework)})'
+                f'📋 {_esc(req.article_reference)} ({_esc(req.framework)})'
                 f'</div>'
             )
             
@@ -590,7 +620,7 @@ class DocumentViewer:
             description = req.description[:100] + "..." if len(req.description) > 100 else req.description
             panel_html.append(
                 f'<div style="color: #495057; font-size: 13px; margin-bottom: 8px; line-height: 1.4;">'
-                f'{self._escape_html(description)}'
+                f'{_esc(description)}'
                 f'</div>'
             )
             
@@ -600,7 +630,7 @@ class DocumentViewer:
                 panel_html.append(
                     f'<div style="background-color: #f8f9fa; border-left: 3px solid #007bff; '
                     f'padding: 8px; margin-top: 8px; font-size: 12px; font-style: italic; color: #495057;">'
-                    f'<strong>Suggested:</strong> {self._escape_html(preview)}'
+                    f'<strong>Suggested:</strong> {_esc(preview)}'
                     f'</div>'
                 )
             
@@ -1,167 +1,877 @@
 """
 Semantic embedding generation service using Sentence Transformers.
 """
+import os
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
 import streamlit as st
-from sentence_transformers import SentenceTransformer
+import torch
+from sentence_transformers import SentenceTransformer, util
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, Union
+from config.settings import config
 from utils.logger import get_logger
 
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = get_logger(__name__)
 
+# Sentence Transformer used when no model name is given
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Sentence Transformers truncates MiniLM inputs at 256 tokens; the ONNX path matches it
+ONNX_MAX_SEQ_LENGTH = 256
+
+# Cached embeddings are stored at half precision; cosine scores are
+# insensitive to the rounding at this dimensionality
+CACHE_DTYPE = np.float16
+
+# Texts at least this long are cached under a 16-byte BLAKE2b digest
+# instead of the full string
+CACHE_HASH_MIN_LENGTH = 64
+
+# Whitespace that BERT's basic tokenizer treats as a plain token separator
+_TOKENIZER_WHITESPACE_RE = re.compile(r'[ \t\n\r]+')
+
+# Adaptive batching: roughly this many (estimated) tokens per encoder batch,
+# with the batch size clamped to [MIN_BATCH_SIZE, MAX_BATCH_SIZE]
+BATCH_TOKEN_BUDGET = 8192
+MIN_BATCH_SIZE = 8
+MAX_BATCH_SIZE = 128
+
+# Maximum mean cosine drift allowed between FP32 and int8 embeddings
+MAX_QUANTIZATION_DRIFT = 0.01
+
+# Fixed sample used to check int8 embeddings against FP32 before switching
+_QUANTIZATION_FIXTURE = [
+    "The processor shall process personal data only on documented instructions from the controller.",
+    "The business associate shall report any security incident of which it becomes aware.",
+    "Consumers have the right to opt out of the sale of their personal information.",
+    "Management shall maintain adequate internal controls over financial reporting.",
+    "Either party may terminate this agreement upon thirty days written notice.",
+]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _cosine_similarity_kernel(a, b):
+        """Fused dot product and norms in a single pass; raw cosine like compute_similarity."""
+        dot = 0.0
+        norm_a = 0.0
+        norm_b = 0.0
+        for i in range(a.shape[0]):
+            dot += a[i] * b[i]
+            norm_a += a[i] * a[i]
+            norm_b += b[i] * b[i]
+        
+        return dot / (np.sqrt(norm_a) * np.sqrt(norm_b) + 1e-12)
+
+
+class _DiskEmbeddingStore:
+    """
+    Append-only on-disk embedding store that survives app restarts.
+    
+    Keys live in a small SQLite index mapping key -> row; vectors live in a
+    float32 np.memmap, so only the rows that are read get paged in. A lock
+    serializes row allocation, since one store is shared by every session
+    thread.
+    
+    Keys are texts only, so the index records the model, backend and
+    dimension that produced its vectors and refuses to open for any other.
+    """
+    
+    def __init__(self, directory: Path, dim: int, capacity: int, model_name: str, backend: str):
+        """
+        Open (or create) the store.
+        
+        Args:
+            directory: Directory holding the index and vector files
+            dim: Embedding dimension
+            capacity: Maximum number of rows in a new vector file
+            model_name: Model whose embeddings are stored
+            backend: Inference backend producing them ("onnx" or "torch")
+            
+        Raises:
+            ValueError: If the directory holds embeddings from another
+                        model or backend
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        
+        # Index and vector files are paired by dimension
+        vectors_path = directory / f"vectors_{dim}.f32"
+        self._db = sqlite3.connect(str(directory / f"index_{dim}.sqlite"), check_same_thread=False)
+        try:
+            self._check_meta({'model_name': model_name, 'backend': backend, 'dim': str(dim)})
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, row INTEGER NOT NULL)"
+            )
+            if not vectors_path.exists():
+                # Rows indexed into a vector file that is gone are unusable
+                self._db.execute("DELETE FROM embeddings")
+            self._db.commit()
+        except Exception:
+            self._db.close()
+            raise
+        self._size = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        
+        # Reopen an existing file at its own capacity
+        if vectors_path.exists():
+            capacity = vectors_path.stat().st_size // (dim * np.dtype(np.float32).itemsize)
+            mode = "r+"
+        else:
+            mode = "w+"
+        self.capacity = capacity
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(capacity, dim))
+    
+    def _check_meta(self, expected: Dict[str, str]):
+        """Record expected in a new index, or raise if an existing one differs."""
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        stored = dict(self._db.execute("SELECT name, value FROM meta").fetchall())
+        if not stored:
+            self._db.executemany("INSERT INTO meta (name, value) VALUES (?, ?)", expected.items())
+        elif stored != expected:
+            raise ValueError(f"Disk embedding cache was built for {stored}, not {expected}")
+    
+    @staticmethod
+    def _db_key(key: Union[str, bytes]) -> bytes:
+        return key.encode("utf-8") if isinstance(key, str) else key
+    
+    def get(self, key: Union[str, bytes]) -> Optional[np.ndarray]:
+        """Return the stored row for key, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT row FROM embeddings WHERE key = ?", (self._db_key(key),)
+            ).fetchone()
+            return None if row is None else self._vectors[row[0]]
+    
+    def put(self, key: Union[str, bytes], embedding: np.ndarray):
+        """Append an embedding; silently skipped once the file is full."""
+        self.put_many([(key, embedding)])
+    
+    def put_many(self, items: List[Tuple[Union[str, bytes], np.ndarray]]):
+        """
+        Append embeddings in one transaction.
+        
+        Vectors are flushed to disk before the index is committed, so a
+        crash never leaves the index pointing at unwritten rows. Keys
+        already stored are skipped, as is everything once the file is full.
+        
+        Args:
+            items: (key, embedding) pairs
+        """
+        with self._lock:
+            start = self._size
+            try:
+                for key, embedding in items:
+                    if self._size >= self.capacity:
+                        break
+                    cursor = self._db.execute(
+                        "INSERT OR IGNORE INTO embeddings (key, row) VALUES (?, ?)",
+                        (self._db_key(key), self._size)
+                    )
+                    if cursor.rowcount:
+                        self._vectors[self._size] = embedding
+                        self._size += 1
+                
+                if self._size > start:
+                    self._vectors.flush()
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                self._size = start
+                raise
+    
+    def __len__(self) -> int:
+        return self._size
+
+
+def _run_onnx(model, tokenizer, texts: List[str]) -> np.ndarray:
+    """
+    Encode one batch with an ONNX Runtime feature-extraction model.
+    
+    Args:
+        model: ORTModelForFeatureExtraction instance
+        tokenizer: Tokenizer matching the model
+        texts: Batch of texts
+        
+    Returns:
+        (N, D) float32 array of L2-normalized embeddings
+    """
+    inputs = tokenizer(
+        texts,
+        padding=True,
+        truncation=True,
+        max_length=ONNX_MAX_SEQ_LENGTH,
+        return_tensors="np"
+    )
+    token_embeddings = model(**inputs).last_hidden_state
+    
+    # Mean-pool over real tokens, then L2-normalize like the
+    # Sentence Transformers pipeline does
+    mask = inputs["attention_mask"][..., None].astype(np.float32)
+    pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled.astype(np.float32)
+
 
 class EmbeddingGenerator:
     """Generate semantic embeddings for clauses using Sentence Transformers."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        use_onnx: bool = True,
+        quantize: bool = True,
+        cache_max: int = 5000,
+        disk_cache_dir: Optional[str] = None,
+        disk_cache_max: int = 100_000
+    ):
         """
         Initialize embedding generator.
         
         Args:
             model_name: Sentence Transformer model name
+            use_onnx: Run the encoder through ONNX Runtime when available
+                      (falls back to PyTorch otherwise)
+            quantize: Use int8 dynamic quantization on the ONNX path when
+                      its embeddings stay within MAX_QUANTIZATION_DRIFT of FP32,
+                      or float16 weights when the PyTorch model runs on GPU
+            cache_max: Maximum number of cached embeddings before the least
+                       recently used entry is evicted
+            disk_cache_dir: Optional directory for a persistent embedding
+                            cache that survives restarts (disabled if None)
+            disk_cache_max: Maximum number of embeddings in a new disk cache
         """
         self.model_name = model_name
-        self.model = self._load_model()
-        self._embedding_cache: Dict[str, np.ndarray] = {}
+        self.model = None
+        self.onnx_model = None
+        self.tokenizer = None
+        
+        if use_onnx and ONNX_AVAILABLE:
+            try:
+                self.onnx_model, self.tokenizer = self._load_onnx_model(model_name, quantize)
+            except Exception as e:
+                logger.warning(f"ONNX Runtime model unavailable, using PyTorch: {e}")
+        
+        if self.onnx_model is None:
+            self.model = self._load_model(quantize)
+        
+        # Read once so fallbacks and preallocated arrays match the loaded model
+        if self.onnx_model is not None:
+            self._dim = int(self.onnx_model.config.hidden_size)
+        else:
+            self._dim = int(self.model.get_sentence_embedding_dimension())
+        
+        # An uncased WordPiece tokenizer ignores case and whitespace runs, so
+        # texts differing only in those encode identically and can share a key
+        tokenizer = self.tokenizer if self.onnx_model is not None else getattr(self.model, "tokenizer", None)
+        self._normalize_keys = bool(getattr(tokenizer, "do_lower_case", False))
+        
+        # LRU cache stored as CACHE_DTYPE, upcast to float32 on the way out
+        self.cache_max = cache_max
+        self._embedding_cache: "OrderedDict[Union[str, bytes], np.ndarray]" = OrderedDict()
+        # One generator is shared across Streamlit sessions; lookups reorder the LRU
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_evictions = 0
+        self._disk_hits = 0
+        
+        # Normalized candidate set cached by set_candidates
+        self._candidates: Optional[Tuple[torch.Tensor, np.ndarray, np.ndarray, int]] = None
+        
+        # Persistent second-level cache behind the in-memory LRU
+        self._disk_store: Optional[_DiskEmbeddingStore] = None
+        if disk_cache_dir:
+            try:
+                self._disk_store = _DiskEmbeddingStore(
+                    Path(disk_cache_dir),
+                    self._dim,
+                    disk_cache_max,
+                    model_name,
+                    "onnx" if self.onnx_model is not None else "torch"
+                )
+                logger.info(f"Disk embedding cache opened with {len(self._disk_store)} entries")
+            except Exception as e:
+                logger.warning(f"Disk embedding cache unavailable: {e}")
     
     @st.cache_resource
-    def _load_model(_self):
+    def _load_model(_self, half_precision: bool = True):
         """
         Load Sentence Transformer model with Streamlit caching.
         
+        Args:
+            half_precision: Cast the weights to float16 when the model runs
+                            on GPU, halving the memory traffic per forward pass
+        
         Returns:
             Loaded SentenceTransformer model
         """
         try:
+            # One thread per core oversubscribes single-text encodes; half the
+            # cores keeps batches fast without thrashing
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+            
             logger.info(f"Loading Sentence Transformer model: {_self.model_name}")
             model = SentenceTransformer(_self.model_name)
+            if half_precision and model.device.type == "cuda":
+                model.half()
+                logger.info("Using float16 weights on GPU")
             logger.info("Sentence Transformer model loaded successfully")
             return model
         except Exception as e:
             logger.error(f"Error loading Sentence Transformer model: {e}")
             raise
     
-    def generate_embedding(self, text: str, use_cache: bool = True) -> np.ndarray:
+    @st.cache_resource
+    def _load_onnx_model(_self, model_name: str, quantize: bool = True):
         """
-        Generate semantic embedding for a single text.
+        Export the model to ONNX and load it into an ONNX Runtime session.
+        
+        The export is kept under the model cache directory so later runs
+        skip re-exporting.
         
         Args:
-            text: Text to embed
-            use_cache: Whether to use cached embeddings
+            model_name: Sentence Transformer model name
+            quantize: Try the int8 dynamically quantized model
+            
+        Returns:
+            Tuple of (ORTModelForFeatureExtraction, tokenizer)
+        """
+        # Short Sentence Transformer names live under the sentence-transformers org
+        model_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        export_dir = Path(config.models.cache_dir) / "onnx" / model_id.replace("/", "__")
+        
+        logger.info(f"Loading ONNX Runtime model: {model_id}")
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = os.cpu_count() or 1
+        
+        if (export_dir / "model.onnx").exists():
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                export_dir,
+                session_options=session_options,
+                provider="CPUExecutionProvider"
+            )
+            tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        else:
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_id,
+                export=True,
+                session_options=session_options,
+                provider="CPUExecutionProvider"
+            )
+            tokenizer = AutoTokenizer.from_pretrained(model_id)
+            model.save_pretrained(export_dir)
+            tokenizer.save_pretrained(export_dir)
+        
+        if quantize:
+            quantized_model = _self._load_quantized_model(
+                export_dir, model, tokenizer, session_options
+            )
+            if quantized_model is not None:
+                model = quantized_model
+        
+        logger.info("ONNX Runtime model loaded successfully")
+        return model, tokenizer
+    
+    @staticmethod
+    def _load_quantized_model(export_dir: Path, fp32_model, tokenizer, session_options):
+        """
+        Load an int8 dynamically quantized copy of the exported model.
+        
+        Args:
+            export_dir: Directory holding the exported model.onnx
+            fp32_model: FP32 model used as the accuracy reference
+            tokenizer: Tokenizer matching the model
+            session_options: ONNX Runtime session options
             
         Returns:
-            Embedding vector as numpy array
+            Quantized model, or None if its embeddings drift too far from FP32
         """
+        quantized_file = "model_quantized.onnx"
         try:
-            # Check cache first
-            if use_cache and text in self._embedding_cache:
-                logger.debug("Using cached embedding")
-                return self._embedding_cache[text]
+            if not (export_dir / quantized_file).exists():
+                quantize_dynamic(
+                    str(export_dir / "model.onnx"),
+                    str(export_dir / quantized_file),
+                    weight_type=QuantType.QInt8,
+                    op_types_to_quantize=["MatMul", "Gemm"]
+                )
             
-            # Generate embedding
-            embedding = self.model.encode(text, convert_to_numpy=True)
+            quantized_model = ORTModelForFeatureExtraction.from_pretrained(
+                export_dir,
+                file_name=quantized_file,
+                session_options=session_options,
+                provider="CPUExecutionProvider"
+            )
             
-            # Cache the result
-            if use_cache:
-                self._embedding_cache[text] = embedding
+            # Both outputs are unit-norm, so the row-wise dot is the cosine
+            reference = _run_onnx(fp32_model, tokenizer, _QUANTIZATION_FIXTURE)
+            candidate = _run_onnx(quantized_model, tokenizer, _QUANTIZATION_FIXTURE)
+            drift = 1.0 - float(np.mean(np.sum(reference * candidate, axis=1)))
+            
+            if drift > MAX_QUANTIZATION_DRIFT:
+                logger.warning(
+                    f"int8 embeddings drift {drift:.4f} from FP32, keeping FP32 model"
+                )
+                return None
+            
+            logger.info(f"Using int8 quantized encoder (drift {drift:.4f})")
+            return quantized_model
             
-            logger.debug(f"Generated embedding with shape: {embedding.shape}")
+        except Exception as e:
+            logger.warning(f"int8 quantization failed, keeping FP32 model: {e}")
+            return None
+    
+    def _encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """
+        Encode text with whichever backend was loaded.
+        
+        Both backends return L2-normalized vectors, so cosine similarity
+        between generated embeddings is a plain dot product.
+        
+        Args:
+            sentences: A single text or a list of texts
+            batch_size: Batch size for encoding
+            show_progress_bar: Show a progress bar (PyTorch backend only)
+            
+        Returns:
+            Embedding vector for a single text, (N, D) array for a list
+        """
+        if self.onnx_model is None:
+            with torch.inference_mode():
+                embeddings = self.model.encode(
+                    sentences,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    batch_size=batch_size,
+                    show_progress_bar=show_progress_bar
+                )
+            # A half precision model returns float16 vectors
+            return embeddings.astype(np.float32, copy=False)
+        
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        
+        chunks = [
+            _run_onnx(self.onnx_model, self.tokenizer, texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+        
+        embeddings = np.concatenate(chunks) if chunks else np.empty((0, self._dim), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+    
+    def _cache_key(self, text: str) -> Union[str, bytes]:
+        """
+        Build the cache key for a text.
+        
+        With an uncased tokenizer the text is first lowercased and its
+        whitespace runs collapsed, which leaves the token ids unchanged.
+        Long texts are keyed by a BLAKE2b digest so the cache does not keep
+        a second copy of every clause; short texts are cheaper to use as-is.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            The (normalized) text itself, or its 16-byte digest
+        """
+        if self._normalize_keys:
+            text = _TOKENIZER_WHITESPACE_RE.sub(' ', text).strip(' ').lower()
+        if len(text) < CACHE_HASH_MIN_LENGTH:
+            return text
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    def _cache_get(self, key: Union[str, bytes]) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding and mark it as recently used.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            float32 embedding, or None on a miss
+        """
+        with self._cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+                self._cache_hits += 1
+        
+        if embedding is None:
+            embedding = self._disk_get(key)
+            if embedding is None:
+                self._cache_misses += 1
             return embedding
+        
+        return embedding.astype(np.float32)
+    
+    def _disk_get(self, key: Union[str, bytes]) -> Optional[np.ndarray]:
+        """
+        Look up an embedding in the disk cache and promote it into memory.
+        
+        Args:
+            key: Cache key
             
+        Returns:
+            float32 embedding, or None if there is no disk cache or no entry
+        """
+        if self._disk_store is None:
+            return None
+        
+        try:
+            row = self._disk_store.get(key)
+        except Exception as e:
+            logger.warning(f"Disk embedding cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        
+        self._disk_hits += 1
+        return self._memory_put(key, row)
+    
+    def _memory_put(self, key: Union[str, bytes], embedding: np.ndarray) -> np.ndarray:
+        """
+        Store an embedding in the LRU, evicting entries over cache_max.
+        
+        Args:
+            key: Cache key
+            embedding: Embedding to store
+            
+        Returns:
+            The embedding at stored precision (as float32)
+        """
+        stored = embedding.astype(CACHE_DTYPE)
+        with self._cache_lock:
+            self._embedding_cache[key] = stored
+            self._embedding_cache.move_to_end(key)
+            
+            while len(self._embedding_cache) > self.cache_max:
+                self._embedding_cache.popitem(last=False)
+                self._cache_evictions += 1
+        
+        return stored.astype(np.float32)
+    
+    def _cache_put(self, key: Union[str, bytes], embedding: np.ndarray) -> np.ndarray:
+        """
+        Store a freshly encoded embedding in memory and, if enabled, on disk.
+        
+        Args:
+            key: Cache key
+            embedding: Embedding to store
+            
+        Returns:
+            The embedding at stored precision (as float32), so hits and
+            misses give identical vectors
+        """
+        embedding = self._memory_put(key, embedding)
+        self._disk_put([(key, embedding)])
+        return embedding
+    
+    def _disk_put(self, items: List[Tuple[Union[str, bytes], np.ndarray]]):
+        """
+        Write embeddings to the disk cache, if enabled, in one commit.
+        
+        A failing disk cache is logged and skipped; the embeddings are
+        still returned from the model.
+        
+        Args:
+            items: (key, embedding) pairs
+        """
+        if self._disk_store is None or not items:
+            return
+        
+        try:
+            self._disk_store.put_many(items)
+        except Exception as e:
+            logger.warning(f"Disk embedding cache write failed: {e}")
+    
+    def generate_embedding(self, text: str, use_cache: bool = True) -> np.ndarray:
+        """
+        Generate semantic embedding for a single text.
+        
+        Args:
+            text: Text to embed
+            use_cache: Whether to use cached embeddings
+            
+        Returns:
+            Unit-norm embedding vector as numpy array
+        """
+        # Check cache first
+        key = self._cache_key(text) if use_cache else None
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.debug("Using cached embedding")
+                return cached
+        
+        # Generate embedding; only the model call can fail at runtime
+        try:
+            embedding = self._encode(text, show_progress_bar=False)
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             # Return zero vector as fallback
-            return np.zeros(384)  # all-MiniLM-L6-v2 dimension
+            return np.zeros(self._dim, dtype=np.float32)
+        
+        # Cache the result
+        if use_cache:
+            embedding = self._cache_put(key, embedding)
+        
+        logger.debug(f"Generated embedding with shape: {embedding.shape}")
+        return embedding
     
     def generate_embeddings_batch(
         self, 
         texts: List[str], 
         use_cache: bool = True,
-        batch_size: int = 32
-    ) -> List[np.ndarray]:
+        batch_size: Optional[int] = None,
+        return_matrix: bool = False
+    ) -> Union[List[np.ndarray], np.ndarray]:
         """
         Generate embeddings for multiple texts efficiently.
         
         Args:
             texts: List of texts to embed
             use_cache: Whether to use cached embeddings
-            batch_size: Batch size for encoding
+            batch_size: Batch size for encoding (default: sized from the
+                        longest text, see _adaptive_batch_size)
+            return_matrix: Return one contiguous (N, D) float32 array instead
+                           of a list of vectors
             
         Returns:
-            List of embedding vectors
+            List of unit-norm embedding vectors, or an (N, D) array if
+            return_matrix is set
         """
         try:
-            embeddings = []
-            texts_to_encode = []
-            text_indices = []
-            
-            # Check cache for each text
-            for idx, text in enumerate(texts):
-                if use_cache and text in self._embedding_cache:
-                    embeddings.append(self._embedding_cache[text])
+            n_texts = len(texts)
+            embeddings: List[Optional[np.ndarray]] = [None] * n_texts
+            cache = self._embedding_cache
+            
+            # Look up every text in one pass under the lock and build a hit mask
+            keys = [self._cache_key(text) for text in texts] if use_cache else [None] * n_texts
+            hit_idx = []
+            hit_stored = []
+            if use_cache:
+                with self._cache_lock:
+                    for i, key in enumerate(keys):
+                        stored = cache.get(key)
+                        if stored is not None:
+                            cache.move_to_end(key)
+                            hit_idx.append(i)
+                            hit_stored.append(stored)
+                    self._cache_hits += len(hit_idx)
+            hit_mask = np.zeros(n_texts, dtype=bool)
+            hit_mask[hit_idx] = True
+            
+            hit_rows = None
+            if hit_idx:
+                # One stack and upcast for all hits instead of one per row
+                hit_rows = np.stack(hit_stored).astype(np.float32)
+                for i, row in zip(hit_idx, hit_rows):
+                    embeddings[i] = row
+            
+            # Uncached texts (by cache key, or by text without the cache)
+            # mapped to every position they occur at, so repeats within the
+            # batch are encoded only once
+            pending_positions: Dict[Union[str, bytes], List[int]] = {}
+            pending_texts: Dict[Union[str, bytes], str] = {}
+            from_disk: Dict[Union[str, bytes], np.ndarray] = {}
+            disk_idx = []
+            for i in np.flatnonzero(~hit_mask).tolist():
+                dedup_key = texts[i] if keys[i] is None else keys[i]
+                if dedup_key in pending_positions:
+                    pending_positions[dedup_key].append(i)
+                    continue
+                
+                # Second-level lookup in the persistent cache
+                if dedup_key not in from_disk and use_cache:
+                    embedding = self._disk_get(keys[i])
+                    if embedding is not None:
+                        from_disk[dedup_key] = embedding
+                
+                if dedup_key in from_disk:
+                    embeddings[i] = from_disk[dedup_key]
+                    disk_idx.append(i)
                 else:
-                    texts_to_encode.append(text)
-                    text_indices.append(idx)
-                    embeddings.append(None)  # Placeholder
-            
-            # Encode uncached texts in batch
-            if texts_to_encode:
-                logger.info(f"Encoding {len(texts_to_encode)} texts in batch")
-                new_embeddings = self.model.encode(
+                    pending_positions[dedup_key] = [i]
+                    pending_texts[dedup_key] = texts[i]
+            
+            if use_cache:
+                self._cache_misses += len(pending_positions)
+            
+            # Encode unique uncached texts in batch
+            if pending_positions:
+                # Encode in length order so each batch pads to similar lengths;
+                # results are scattered back by key, so no unsort is needed
+                keys_to_encode = sorted(pending_positions, key=lambda k: len(pending_texts[k]))
+                texts_to_encode = [pending_texts[k] for k in keys_to_encode]
+                if batch_size is None:
+                    batch_size = self._adaptive_batch_size(texts_to_encode)
+                
+                logger.info(
+                    f"Encoding {len(texts_to_encode)} texts in batch "
+                    f"(batch_size={batch_size})"
+                )
+                new_embeddings = self._encode(
                     texts_to_encode,
-                    convert_to_numpy=True,
                     batch_size=batch_size,
                     show_progress_bar=len(texts_to_encode) > 10
                 )
                 
-                # Update cache and results
-                for idx, text, embedding in zip(text_indices, texts_to_encode, new_embeddings):
+                # Update cache once per unique text and scatter to all positions
+                to_persist = []
+                for dedup_key, embedding in zip(keys_to_encode, new_embeddings):
                     if use_cache:
-                        self._embedding_cache[text] = embedding
-                    embeddings[idx] = embedding
+                        embedding = self._memory_put(dedup_key, embedding)
+                        to_persist.append((dedup_key, embedding))
+                    for idx in pending_positions[dedup_key]:
+                        embeddings[idx] = embedding
+                
+                # One disk commit for the whole batch
+                self._disk_put(to_persist)
             
             logger.info(f"Generated {len(embeddings)} embeddings")
+            
+            if return_matrix:
+                matrix = np.empty((n_texts, self._dim), dtype=np.float32)
+                if hit_idx:
+                    matrix[hit_idx] = hit_rows
+                for i in disk_idx:
+                    matrix[i] = embeddings[i]
+                for positions in pending_positions.values():
+                    matrix[positions] = embeddings[positions[0]]
+                return matrix
+            
             return embeddings
             
         except Exception as e:
             logger.error(f"Error generating batch embeddings: {e}")
             # Return zero vectors as fallback
-            return [np.zeros(384) for _ in texts]
+            if return_matrix:
+                return np.zeros((len(texts), self._dim), dtype=np.float32)
+            return [np.zeros(self._dim, dtype=np.float32) for _ in texts]
     
-    def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
+    @staticmethod
+    def _adaptive_batch_size(texts: List[str]) -> int:
+        """
+        Pick an encoder batch size from the longest text.
+        
+        Short clauses get large batches; long paragraphs get small ones so a
+        padded batch stays within BATCH_TOKEN_BUDGET.
+        
+        Args:
+            texts: Texts about to be encoded
+            
+        Returns:
+            Batch size
+        """
+        # Word count is a cheap token estimate; the encoder truncates anyway
+        longest = min(max(len(text.split()) for text in texts), ONNX_MAX_SEQ_LENGTH)
+        return max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, BATCH_TOKEN_BUDGET // max(1, longest)))
+    
+    def compute_similarity(
+        self,
+        embedding1: np.ndarray,
+        embedding2: np.ndarray,
+        unit_norm: bool = False,
+        normalized_output: bool = False
+    ) -> float:
         """
         Compute cosine similarity between two embeddings.
         
         Args:
             embedding1: First embedding vector
             embedding2: Second embedding vector
+            unit_norm: Both vectors are already L2-normalized (as returned by
+                       generate_embedding), so the norms are skipped
+            normalized_output: Map the score from [-1, 1] onto [0, 1]
             
         Returns:
-            Cosine similarity score (0-1)
+            Cosine similarity score (-1 to 1, or 0-1 with normalized_output);
+            a zero vector scores 0.0 on the raw scale
         """
-        try:
-            # Compute cosine similarity
-            dot_product = np.dot(embedding1, embedding2)
-            norm1 = np.linalg.norm(embedding1)
-            norm2 = np.linalg.norm(embedding2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            similarity = dot_product / (norm1 * norm2)
-            # Ensure result is in [0, 1] range
-            similarity = (similarity + 1) / 2
-            
-            return float(similarity)
+        if unit_norm:
+            similarity = float(np.dot(embedding1, embedding2))
+        elif (
+            NUMBA_AVAILABLE
+            and embedding1.dtype == np.float32
+            and embedding2.dtype == np.float32
+            and embedding1.ndim == 1
+            and embedding1.shape == embedding2.shape
+        ):
+            # JIT kernel for the float32 vectors this class produces
+            similarity = float(_cosine_similarity_kernel(embedding1, embedding2))
+        else:
+            # Epsilon keeps zero vectors at 0.0 without a branch
+            denom = np.linalg.norm(embedding1) * np.linalg.norm(embedding2) + 1e-12
+            similarity = float(np.dot(embedding1, embedding2) / denom)
+        
+        if normalized_output:
+            return (similarity + 1) * 0.5
+        return similarity
+    
+    @staticmethod
+    def _prepare_candidates(candidate_embeddings) -> Tuple[torch.Tensor, np.ndarray, np.ndarray, int]:
+        """
+        Normalize candidates once for dot-product search.
+        
+        Args:
+            candidate_embeddings: List or (N, D) array of candidate embeddings
             
-        except Exception as e:
-            logger.error(f"Error computing similarity: {e}")
-            return 0.0
+        Returns:
+            Tuple of (unit-norm corpus tensor of non-zero rows, their original
+            indices, indices of zero-norm rows, total candidate count)
+        """
+        candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(candidates, axis=1)
+        valid = norms > 0
+        valid_idx = np.flatnonzero(valid)
+        corpus = candidates[valid_idx] / norms[valid_idx, None]
+        return torch.from_numpy(np.ascontiguousarray(corpus)), valid_idx, np.flatnonzero(~valid), len(candidates)
+    
+    def set_candidates(self, candidate_embeddings: Union[List[np.ndarray], np.ndarray]):
+        """
+        Cache a candidate set for repeated find_most_similar queries.
+        
+        Candidates are normalized once here, so each query is a single
+        dot-product search.
+        
+        Args:
+            candidate_embeddings: List or (N, D) array of candidate embeddings
+        """
+        if len(candidate_embeddings) == 0:
+            self._candidates = None
+            return
+        self._candidates = self._prepare_candidates(candidate_embeddings)
     
     def find_most_similar(
         self,
         query_embedding: np.ndarray,
-        candidate_embeddings: List[np.ndarray],
+        candidate_embeddings: Optional[Union[List[np.ndarray], np.ndarray]] = None,
         top_k: int = 5
     ) -> List[tuple]:
         """
@@ -169,32 +879,67 @@ class EmbeddingGenerator:
         
         Args:
             query_embedding: Query embedding vector
-            candidate_embeddings: List of candidate embeddings
+            candidate_embeddings: List of candidate embeddings (default: the
+                                  set cached by set_candidates)
             top_k: Number of top results to return
             
         Returns:
             List of (index, similarity_score) tuples sorted by similarity
         """
-        try:
-            similarities = []
-            for idx, candidate in enumerate(candidate_embeddings):
-                similarity = self.compute_similarity(query_embedding, candidate)
-                similarities.append((idx, similarity))
-            
-            # Sort by similarity descending
-            similarities.sort(key=lambda x: x[1], reverse=True)
-            
-            return similarities[:top_k]
-            
-        except Exception as e:
-            logger.error(f"Error finding similar embeddings: {e}")
-            return []
+        if candidate_embeddings is None:
+            if self._candidates is None:
+                return []
+            corpus, valid_idx, zero_idx, n_candidates = self._candidates
+        else:
+            if len(candidate_embeddings) == 0:
+                return []
+            corpus, valid_idx, zero_idx, n_candidates = self._prepare_candidates(candidate_embeddings)
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        
+        # Zero-norm vectors score 0.0 (as compute_similarity did on its 0-1 scale), which
+        # ranks them below every real candidate, so only the rest are searched
+        results = []
+        if query_norm > 0 and valid_idx.size:
+            hits = util.semantic_search(
+                torch.from_numpy(query / query_norm).unsqueeze(0),
+                corpus,
+                top_k=top_k,
+                score_function=util.dot_score
+            )[0]
+            # Map cosine scores back onto the 0-1 scale
+            results = [
+                (int(valid_idx[hit['corpus_id']]), float((hit['score'] + 1) / 2))
+                for hit in hits
+            ]
+        else:
+            zero_idx = np.arange(n_candidates)
+        
+        remaining = top_k - len(results)
+        if remaining > 0:
+            results.extend((int(idx), 0.0) for idx in zero_idx[:remaining])
+        
+        return results
     
     def clear_cache(self):
         """Clear the embedding cache."""
-        self._embedding_cache.clear()
+        with self._cache_lock:
+            self._embedding_cache.clear()
         logger.info("Embedding cache cleared")
     
     def get_cache_size(self) -> int:
         """Get the number of cached embeddings."""
         return len(self._embedding_cache)
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Get embedding cache hit, miss and eviction counters."""
+        return {
+            'hits': self._cache_hits,
+            'misses': self._cache_misses,
+            'evictions': self._cache_evictions,
+            'disk_hits': self._disk_hits,
+            'disk_size': len(self._disk_store) if self._disk_store is not None else 0,
+            'size': len(self._embedding_cache),
+            'max_size': self.cache_max
+        }
@@ -5,22 +5,113 @@ Handles exporting compliance reports in various formats (JSON, CSV, PDF).
 import json
 import csv
 import io
+import functools
+import importlib.util
+from bisect import bisect_right
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from enum import Enum
+from operator import attrgetter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional, Dict, Any, Union, BinaryIO
 
-try:
+# reportlab is only imported when the first PDF is generated, so JSON/CSV
+# exports and importing this module do not pay for it
+REPORTLAB_AVAILABLE = importlib.util.find_spec('reportlab') is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_reportlab() -> SimpleNamespace:
+    """
+    Import reportlab and build the shared colors and table styles, once.
+    
+    Returns:
+        Namespace holding the reportlab classes and shared styles used by
+        PDFReportGenerator
+    """
     from reportlab.lib import colors
-    from reportlab.lib.pagesizes import letter, A4
+    from reportlab.lib.pagesizes import letter
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
     from reportlab.platypus import (
-        SimpleDocTemplate, Table, TableStyle, Paragraph, 
-        Spacer, PageBreak, Image
+        SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph,
+        Spacer, PageBreak
     )
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    REPORTLAB_AVAILABLE = True
+    from reportlab.lib.enums import TA_CENTER
+    
+    # Colors and table styles shared by every report
+    HEADER_COLOR = colors.HexColor('#2e86ab')
+    
+    # Risk cell backgrounds; anything other than High/Medium renders as Low
+    RISK_COLORS = {
+        'High': colors.HexColor('#ff6b6b'),
+        'Medium': colors.HexColor('#ffd166'),
+        'Low': colors.HexColor('#06d6a0')
+    }
+    
+    def _data_table_style(header_color, font_size, padding, grid_width, grid_color, stripe_color):
+        """Build the header/grid/striped-row style used by the report tables."""
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), header_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), font_size),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), padding),
+            ('GRID', (0, 0), (-1, -1), grid_width, grid_color),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor(stripe_color)])
+        ])
+    
+    INFO_TABLE_STYLE = TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ])
+    SUMMARY_TABLE_STYLE = _data_table_style(HEADER_COLOR, 10, 8, 1, colors.black, '#f0f0f0')
+    DETAILS_TABLE_STYLE = _data_table_style(HEADER_COLOR, 8, 6, 0.5, colors.grey, '#f9f9f9')
+    MISSING_TABLE_STYLE = _data_table_style(RISK_COLORS['High'], 8, 6, 0.5, colors.grey, '#fff0f0')
+    RECOMMENDATIONS_TABLE_STYLE = _data_table_style(HEADER_COLOR, 8, 6, 0.5, colors.grey, '#f0f8ff')
+    
+    # Spacer sizes; reportlab attaches the canvas and frame to a flowable while
+    # drawing it, so each report creates its own Spacer instances
+    SMALL_SPACE = (1, 0.2 * inch)
+    LARGE_SPACE = (1, 0.3 * inch)
+    
+    return SimpleNamespace(
+        colors=colors,
+        letter=letter,
+        getSampleStyleSheet=getSampleStyleSheet,
+        ParagraphStyle=ParagraphStyle,
+        inch=inch,
+        SimpleDocTemplate=SimpleDocTemplate,
+        Table=Table,
+        LongTable=LongTable,
+        Paragraph=Paragraph,
+        Spacer=Spacer,
+        PageBreak=PageBreak,
+        TA_CENTER=TA_CENTER,
+        HEADER_COLOR=HEADER_COLOR,
+        RISK_COLORS=RISK_COLORS,
+        INFO_TABLE_STYLE=INFO_TABLE_STYLE,
+        SUMMARY_TABLE_STYLE=SUMMARY_TABLE_STYLE,
+        DETAILS_TABLE_STYLE=DETAILS_TABLE_STYLE,
+        MISSING_TABLE_STYLE=MISSING_TABLE_STYLE,
+        RECOMMENDATIONS_TABLE_STYLE=RECOMMENDATIONS_TABLE_STYLE,
+        SMALL_SPACE=SMALL_SPACE,
+        LARGE_SPACE=LARGE_SPACE
+    )
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    REPORTLAB_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# pyarrow is only imported by _previews once a report is large enough to use it
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
 
 from models.regulatory_requirement import ComplianceReport
 from models.recommendation import Recommendation
@@ -28,6 +119,91 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Lower score bounds for each overall assessment, lowest band first
+ASSESSMENT_THRESHOLDS = (60, 70, 80, 90)
+ASSESSMENT_TEXTS = (
+    "Poor compliance. Immediate action required.",
+    "Fair compliance. Significant improvements needed.",
+    "Moderate compliance. Several issues require remediation.",
+    "Good compliance. Some areas need attention.",
+    "Excellent compliance. Minor improvements recommended."
+)
+
+# Executive summary rows: table labels and the ComplianceSummary fields behind them
+SUMMARY_LABELS = (
+    'Total Clauses Analyzed',
+    'Compliant Clauses',
+    'Non-Compliant Clauses',
+    'Partial Compliance',
+    'High Risk Items',
+    'Medium Risk Items',
+    'Low Risk Items'
+)
+SUMMARY_FIELDS = attrgetter(
+    'total_clauses',
+    'compliant_clauses',
+    'non_compliant_clauses',
+    'partial_clauses',
+    'high_risk_count',
+    'medium_risk_count',
+    'low_risk_count'
+)
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize report models through their to_dict() for the JSON encoder."""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _preview(text: str, limit: int) -> str:
+    """Truncate text to limit characters, marking the cut with '...'."""
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+# Below this many rows the per-row Python truncation is cheaper than an Arrow round trip
+ARROW_PREVIEW_MIN_ROWS = 1000
+
+
+def _previews(texts: List[str], limit: int) -> List[str]:
+    """
+    Truncate many texts at once, as _preview does for one.
+    
+    Large batches go through Arrow's vectorized string kernels when
+    pyarrow is installed.
+    
+    Args:
+        texts: Texts to truncate
+        limit: Maximum characters kept before the '...' marker
+        
+    Returns:
+        Preview strings in input order
+    """
+    if not PYARROW_AVAILABLE or len(texts) < ARROW_PREVIEW_MIN_ROWS:
+        return [_preview(text, limit) for text in texts]
+    
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    array = pa.array(texts, type=pa.string())
+    truncated = pc.binary_join_element_wise(
+        pc.utf8_slice_codeunits(array, 0, limit), '...', ''
+    )
+    return pc.if_else(
+        pc.greater(pc.utf8_length(array), limit), truncated, array
+    ).to_pylist()
+
+
+class _CSVChunks(list):
+    """List of CSV chunks that csv.writer can write into directly."""
+    
+    write = list.append
+
 
 class ExportService:
     """
@@ -42,7 +218,9 @@ class ExportService:
         self,
         report: ComplianceReport,
         recommendations: Optional[List[Recommendation]] = None,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        timestamp: Optional[datetime] = None,
+        wrap: bool = True
     ) -> str:
         """
         Export compliance report to JSON format.
@@ -51,6 +229,10 @@ class ExportService:
             report: ComplianceReport to export
             recommendations: Optional list of recommendations
             include_metadata: Whether to include export metadata
+            timestamp: Export time shared with the filename (defaults to now)
+            wrap: Nest the report under a 'report' key. When False and there
+                  are no recommendations or metadata, the report object is
+                  emitted on its own
             
         Returns:
             JSON string representation of the report
@@ -58,24 +240,40 @@ class ExportService:
         logger.info(f"Exporting report {report.document_id} to JSON...")
         
         try:
-            # Build export data structure
-            export_data = {
-                'report': report.to_dict(),
-                'recommendations': [
-                    rec.to_dict() for rec in recommendations
-                ] if recommendations else []
-            }
+            # Models are handed to the encoder as-is; _json_default turns each
+            # one into its dict as the encoder reaches it
+            if not wrap and not recommendations and not include_metadata:
+                # Nothing to wrap around the report, so skip the envelope
+                export_data = report
+            else:
+                export_data = {
+                    'report': report,
+                    'recommendations': recommendations or []
+                }
             
             # Add metadata if requested
             if include_metadata:
                 export_data['metadata'] = {
-                    'export_date': datetime.now().isoformat(),
+                    'export_date': (timestamp or datetime.now()).isoformat(),
                     'export_format': 'JSON',
                     'version': '1.0'
                 }
             
-            # Convert to JSON with pretty printing
-            json_str = json.dumps(export_data, indent=2, ensure_ascii=False)
+            # Convert to JSON with pretty printing; stdlib json falls back to
+            # its pure-Python encoder when indenting, orjson stays in C
+            if ORJSON_AVAILABLE:
+                json_str = orjson.dumps(
+                    export_data,
+                    default=_json_default,
+                    option=(
+                        orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                        | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATACLASS
+                    )
+                ).decode('utf-8')
+            else:
+                json_str = json.dumps(
+                    export_data, indent=2, ensure_ascii=False, default=_json_default
+                )
             
             logger.info(
                 f"Successfully exported report to JSON "
@@ -88,18 +286,22 @@ class ExportService:
             logger.error(f"Error exporting to JSON: {e}", exc_info=True)
             raise ExportError(f"Failed to export to JSON: {e}")
     
-    def get_json_filename(self, report: ComplianceReport) -> str:
+    def get_json_filename(
+        self,
+        report: ComplianceReport,
+        timestamp: Optional[datetime] = None
+    ) -> str:
         """
         Generate a filename for JSON export.
         
         Args:
             report: ComplianceReport
+            timestamp: Export time to embed (defaults to now)
             
         Returns:
             Suggested filename
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"compliance_report_{report.document_id}_{timestamp}.json"
+        return self._build_filename(report, 'json', timestamp)
     
     def export_to_csv(
         self,
@@ -120,8 +322,8 @@ class ExportService:
         logger.info(f"Exporting report {report.document_id} to CSV...")
         
         try:
-            # Create in-memory string buffer
-            output = io.StringIO()
+            # Collect written chunks and join them once at the end
+            output = _CSVChunks()
             
             # Define CSV columns
             fieldnames = [
@@ -136,85 +338,85 @@ class ExportService:
                 'Clause Text (Preview)'
             ]
             
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
+            # One writer for every section so the csv module handles quoting
+            writer = csv.writer(output)
+            writer.writerow(fieldnames)
             
-            # Write clause results
-            for result in report.clause_results:
-                # Prepare issues string
-                issues_str = '; '.join(result.issues) if result.issues else 'None'
-                
-                # Prepare matched requirements string
-                req_str = '; '.join([
-                    f"{req.article_reference}"
-                    for req in result.matched_requirements
-                ]) if result.matched_requirements else 'None'
-                
-                # Truncate clause text for preview
-                clause_preview = (
-                    result.clause_text[:100] + '...'
-                    if len(result.clause_text) > 100
-                    else result.clause_text
+            identity = attrgetter('clause_id', 'clause_type', 'framework')
+            article_reference = attrgetter('article_reference')
+            
+            # Truncate clause text for preview, vectorized for large reports
+            clause_previews = _previews(
+                [result.clause_text for result in report.clause_results], 100
+            )
+            
+            # Write clause results in a single writerows call
+            writer.writerows(
+                (
+                    *identity(result),
+                    result.compliance_status.value,
+                    result.risk_level.value,
+                    f"{result.confidence * 100:.1f}%",
+                    '; '.join(result.issues) if result.issues else 'None',
+                    '; '.join(map(article_reference, result.matched_requirements))
+                    if result.matched_requirements else 'None',
+                    clause_preview
                 )
-                
-                writer.writerow({
-                    'Clause ID': result.clause_id,
-                    'Clause Type': result.clause_type,
-                    'Framework': result.framework,
-                    'Compliance Status': result.compliance_status.value,
-                    'Risk Level': result.risk_level.value,
-                    'Confidence': f"{result.confidence * 100:.1f}%",
-                    'Issues': issues_str,
-                    'Matched Requirements': req_str,
-                    'Clause Text (Preview)': clause_preview
-                })
+                for result, clause_preview in zip(report.clause_results, clause_previews)
+            )
             
             # Add summary section
-            output.write('\n')
-            output.write('SUMMARY\n')
-            output.write(f'Document ID,{report.document_id}\n')
-            output.write(f'Overall Score,{report.overall_score:.1f}%\n')
-            output.write(f'Frameworks Checked,{"; ".join(report.frameworks_checked)}\n')
+            writer.writerow([])
+            writer.writerow(['SUMMARY'])
+            summary_rows = [
+                ('Document ID', report.document_id),
+                ('Overall Score', f"{report.overall_score:.1f}%"),
+                ('Frameworks Checked', '; '.join(report.frameworks_checked))
+            ]
             
             if report.summary:
-                output.write(f'Total Clauses,{report.summary.total_clauses}\n')
-                output.write(f'Compliant Clauses,{report.summary.compliant_clauses}\n')
-                output.write(f'Non-Compliant Clauses,{report.summary.non_compliant_clauses}\n')
-                output.write(f'Partial Clauses,{report.summary.partial_clauses}\n')
-                output.write(f'High Risk Count,{report.summary.high_risk_count}\n')
-                output.write(f'Medium Risk Count,{report.summary.medium_risk_count}\n')
-                output.write(f'Low Risk Count,{report.summary.low_risk_count}\n')
+                summary_rows.extend([
+                    ('Total Clauses', report.summary.total_clauses),
+                    ('Compliant Clauses', report.summary.compliant_clauses),
+                    ('Non-Compliant Clauses', report.summary.non_compliant_clauses),
+                    ('Partial Clauses', report.summary.partial_clauses),
+                    ('High Risk Count', report.summary.high_risk_count),
+                    ('Medium Risk Count', report.summary.medium_risk_count),
+                    ('Low Risk Count', report.summary.low_risk_count)
+                ])
+            
+            writer.writerows(summary_rows)
             
             # Add missing requirements section
             if report.missing_requirements:
-                output.write('\n')
-                output.write('MISSING REQUIREMENTS\n')
-                output.write('Framework,Article Reference,Clause Type,Description\n')
-                
-                for req in report.missing_requirements:
-                    # Escape description for CSV
-                    desc = req.description.replace('"', '""')
-                    output.write(
-                        f'{req.framework},{req.article_reference},'
-                        f'{req.clause_type},"{desc}"\n'
-                    )
+                writer.writerow([])
+                writer.writerow(['MISSING REQUIREMENTS'])
+                writer.writerow(['Framework', 'Article Reference', 'Clause Type', 'Description'])
+                writer.writerows(
+                    (req.framework, req.article_reference, req.clause_type, req.description)
+                    for req in report.missing_requirements
+                )
             
             # Add recommendations section if provided
             if recommendations:
-                output.write('\n')
-                output.write('RECOMMENDATIONS\n')
-                output.write('Priority,Action Type,Clause ID,Description,Regulatory Reference\n')
-                
-                for rec in recommendations:
-                    desc = rec.description.replace('"', '""')
-                    output.write(
-                        f'{rec.get_priority_label()},{rec.action_type.value},'
-                        f'{rec.clause_id or "N/A"},"{desc}",'
-                        f'{rec.regulatory_reference}\n'
+                writer.writerow([])
+                writer.writerow(['RECOMMENDATIONS'])
+                writer.writerow([
+                    'Priority', 'Action Type', 'Clause ID',
+                    'Description', 'Regulatory Reference'
+                ])
+                writer.writerows(
+                    (
+                        rec.get_priority_label(),
+                        rec.action_type.value,
+                        rec.clause_id or 'N/A',
+                        rec.description,
+                        rec.regulatory_reference
                     )
+                    for rec in recommendations
+                )
             
-            csv_str = output.getvalue()
-            output.close()
+            csv_str = ''.join(output)
             
             logger.info(
                 f"Successfully exported report to CSV "
@@ -227,23 +429,28 @@ class ExportService:
             logger.error(f"Error exporting to CSV: {e}", exc_info=True)
             raise ExportError(f"Failed to export to CSV: {e}")
     
-    def get_csv_filename(self, report: ComplianceReport) -> str:
+    def get_csv_filename(
+        self,
+        report: ComplianceReport,
+        timestamp: Optional[datetime] = None
+    ) -> str:
         """
         Generate a filename for CSV export.
         
         Args:
             report: ComplianceReport
+            timestamp: Export time to embed (defaults to now)
             
         Returns:
             Suggested filename
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"compliance_report_{report.document_id}_{timestamp}.csv"
+        return self._build_filename(report, 'csv', timestamp)
     
     def export_to_pdf(
         self,
         report: ComplianceReport,
-        recommendations: Optional[List[Recommendation]] = None
+        recommendations: Optional[List[Recommendation]] = None,
+        timestamp: Optional[datetime] = None
     ) -> bytes:
         """
         Export compliance report to PDF format.
@@ -251,6 +458,7 @@ class ExportService:
         Args:
             report: ComplianceReport to export
             recommendations: Optional list of recommendations
+            timestamp: Export time shown on the title page (defaults to now)
             
         Returns:
             PDF file as bytes
@@ -267,7 +475,7 @@ class ExportService:
         try:
             # Create PDF generator and generate report
             pdf_generator = PDFReportGenerator()
-            pdf_bytes = pdf_generator.generate_report(report, recommendations)
+            pdf_bytes = pdf_generator.generate_report(report, recommendations, timestamp)
             
             logger.info(
                 f"Successfully exported report to PDF "
@@ -280,18 +488,151 @@ class ExportService:
             logger.error(f"Error exporting to PDF: {e}", exc_info=True)
             raise ExportError(f"Failed to export to PDF: {e}")
     
-    def get_pdf_filename(self, report: ComplianceReport) -> str:
+    def export_to_pdf_stream(
+        self,
+        report: ComplianceReport,
+        sink: BinaryIO,
+        recommendations: Optional[List[Recommendation]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> None:
+        """
+        Export compliance report as PDF directly into a binary sink.
+        
+        Avoids holding a second in-memory copy of the PDF when the caller
+        is writing it to a file or response body anyway.
+        
+        Args:
+            report: ComplianceReport to export
+            sink: Binary file-like object to write the PDF into
+            recommendations: Optional list of recommendations
+            timestamp: Export time shown on the title page (defaults to now)
+        """
+        logger.info(f"Streaming report {report.document_id} to PDF...")
+        
+        if not REPORTLAB_AVAILABLE:
+            logger.error("ReportLab not available for PDF generation")
+            raise ExportError(
+                "PDF export requires reportlab library. "
+                "Install with: pip install reportlab"
+            )
+        
+        try:
+            pdf_generator = PDFReportGenerator()
+            pdf_generator.generate_report(report, recommendations, timestamp, sink=sink)
+            
+        except Exception as e:
+            logger.error(f"Error exporting to PDF: {e}", exc_info=True)
+            raise ExportError(f"Failed to export to PDF: {e}")
+    
+    def get_pdf_filename(
+        self,
+        report: ComplianceReport,
+        timestamp: Optional[datetime] = None
+    ) -> str:
         """
         Generate a filename for PDF export.
         
         Args:
             report: ComplianceReport
+            timestamp: Export time to embed (defaults to now)
             
         Returns:
             Suggested filename
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"compliance_report_{report.document_id}_{timestamp}.pdf"
+        return self._build_filename(report, 'pdf', timestamp)
+    
+    def export_all(
+        self,
+        report: ComplianceReport,
+        recommendations: Optional[List[Recommendation]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Export compliance report to JSON, CSV and PDF concurrently.
+        
+        PDF generation dominates, so the text formats are produced while
+        the PDF is being built instead of one after another.
+        
+        Args:
+            report: ComplianceReport to export
+            recommendations: Optional list of recommendations
+            timestamp: Export time shared by all formats (defaults to now)
+            
+        Returns:
+            Dictionary mapping 'json', 'csv' and 'pdf' to the exported data
+        """
+        timestamp = timestamp or datetime.now()
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'json': executor.submit(
+                    self.export_to_json, report, recommendations, timestamp=timestamp
+                ),
+                'csv': executor.submit(self.export_to_csv, report, recommendations),
+                'pdf': executor.submit(
+                    self.export_to_pdf, report, recommendations, timestamp=timestamp
+                )
+            }
+            
+            # Each export_to_* already wraps its failures in ExportError
+            return {fmt: future.result() for fmt, future in futures.items()}
+    
+    def persist_all(
+        self,
+        exports: Dict[str, Any],
+        directory: Union[str, Path],
+        report: ComplianceReport,
+        timestamp: Optional[datetime] = None
+    ) -> Dict[str, Path]:
+        """
+        Write exported artifacts to disk under their suggested filenames.
+        
+        The writes are issued together on a thread pool so the per-file
+        open/write/close latency overlaps instead of adding up.
+        
+        Args:
+            exports: Dictionary from export_all mapping format to data
+            directory: Directory to write into (created if missing)
+            report: ComplianceReport the artifacts were exported from
+            timestamp: Export time used in the filenames (defaults to now)
+            
+        Returns:
+            Dictionary mapping each format to the written path
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        timestamp = timestamp or datetime.now()
+        
+        paths = {
+            fmt: directory / self._build_filename(report, fmt, timestamp)
+            for fmt in exports
+        }
+        
+        def write(fmt: str) -> None:
+            data = exports[fmt]
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            paths[fmt].write_bytes(data)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(exports))) as executor:
+                list(executor.map(write, exports))
+        except OSError as e:
+            logger.error(f"Error writing exports to {directory}: {e}", exc_info=True)
+            raise ExportError(f"Failed to write exports: {e}")
+        
+        logger.info(f"Wrote {len(paths)} export files to {directory}")
+        return paths
+    
+    def _build_filename(
+        self,
+        report: ComplianceReport,
+        extension: str,
+        timestamp: Optional[datetime]
+    ) -> str:
+        """Build the export filename for a report and extension."""
+        stamp = (timestamp or datetime.now()).strftime("%Y%m%d_%H%M%S")
+        return f"compliance_report_{report.document_id}_{stamp}.{extension}"
 
 
 class PDFReportGenerator:
@@ -299,67 +640,85 @@ class PDFReportGenerator:
     Generate formatted PDF reports for compliance analysis.
     """
     
+    _styles = None
+    
     def __init__(self):
         """Initialize PDF Report Generator."""
         if not REPORTLAB_AVAILABLE:
             raise ExportError("ReportLab library not available")
         
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        self._rl = _load_reportlab()
+        self.styles = self._get_styles(self._rl)
     
-    def _setup_custom_styles(self):
+    @classmethod
+    def _get_styles(cls, rl: SimpleNamespace):
+        """Return the shared stylesheet, building it on first use."""
+        if cls._styles is None:
+            # Publish only once the custom styles are in, so concurrent
+            # callers never see a partial stylesheet
+            styles = rl.getSampleStyleSheet()
+            cls._setup_custom_styles(styles, rl)
+            cls._styles = styles
+        return cls._styles
+    
+    @staticmethod
+    def _setup_custom_styles(styles, rl: SimpleNamespace):
         """Set up custom paragraph styles."""
         # Title style
-        self.styles.add(ParagraphStyle(
+        styles.add(rl.ParagraphStyle(
             name='CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=24,
-            textColor=colors.HexColor('#1f77b4'),
+            textColor=rl.colors.HexColor('#1f77b4'),
             spaceAfter=30,
-            alignment=TA_CENTER
+            alignment=rl.TA_CENTER
         ))
         
         # Section header style
-        self.styles.add(ParagraphStyle(
+        styles.add(rl.ParagraphStyle(
             name='SectionHeader',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=16,
-            textColor=colors.HexColor('#2e86ab'),
+            textColor=rl.HEADER_COLOR,
             spaceAfter=12,
             spaceBefore=12
         ))
         
         # Subsection style
-        self.styles.add(ParagraphStyle(
+        styles.add(rl.ParagraphStyle(
             name='SubSection',
-            parent=self.styles['Heading3'],
+            parent=styles['Heading3'],
             fontSize=12,
-            textColor=colors.HexColor('#333333'),
+            textColor=rl.colors.HexColor('#333333'),
             spaceAfter=6
         ))
     
     def generate_report(
         self,
         report: ComplianceReport,
-        recommendations: Optional[List[Recommendation]] = None
-    ) -> bytes:
+        recommendations: Optional[List[Recommendation]] = None,
+        timestamp: Optional[datetime] = None,
+        sink: Optional[BinaryIO] = None
+    ) -> Optional[bytes]:
         """
         Generate complete PDF report.
         
         Args:
             report: ComplianceReport to generate
             recommendations: Optional list of recommendations
+            timestamp: Analysis date shown on the title page (defaults to now)
+            sink: Binary file-like object to write the PDF into directly
             
         Returns:
-            PDF file as bytes
+            PDF file as bytes, or None when written to a sink
         """
-        # Create in-memory buffer
-        buffer = io.BytesIO()
+        # Write straight into the caller's sink, or an in-memory buffer
+        buffer = sink if sink is not None else io.BytesIO()
         
         # Create PDF document
-        doc = SimpleDocTemplate(
+        doc = self._rl.SimpleDocTemplate(
             buffer,
-            pagesize=letter,
+            pagesize=self._rl.letter,
             rightMargin=72,
             leftMargin=72,
             topMargin=72,
@@ -370,7 +729,7 @@ class PDFReportGenerator:
         story = []
         
         # Add title page
-        story.extend(self._create_title_page(report))
+        story.extend(self._create_title_page(report, timestamp or datetime.now()))
         
         # Add executive summary
         story.extend(self._create_executive_summary(report))
@@ -389,114 +748,100 @@ class PDFReportGenerator:
         # Build PDF
         doc.build(story)
         
+        if sink is not None:
+            return None
+        
         # Get PDF bytes
         pdf_bytes = buffer.getvalue()
         buffer.close()
         
         return pdf_bytes
     
-    def _create_title_page(self, report: ComplianceReport) -> List:
+    def _create_title_page(self, report: ComplianceReport, timestamp: datetime) -> List:
         """Create title page elements."""
+        inch = self._rl.inch
         elements = []
         
         # Title
-        title = Paragraph(
+        title = self._rl.Paragraph(
             "Compliance Analysis Report",
             self.styles['CustomTitle']
         )
         elements.append(title)
-        elements.append(Spacer(1, 0.3 * inch))
+        elements.append(self._rl.Spacer(*self._rl.LARGE_SPACE))
         
         # Document info
         info_data = [
             ['Document ID:', report.document_id],
-            ['Analysis Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Analysis Date:', timestamp.strftime('%Y-%m-%d %H:%M:%S')],
             ['Frameworks:', ', '.join(report.frameworks_checked)],
             ['Overall Score:', f"{report.overall_score:.1f}%"]
         ]
         
-        info_table = Table(info_data, colWidths=[2 * inch, 4 * inch])
-        info_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
+        info_table = self._rl.Table(info_data, colWidths=[2 * inch, 4 * inch])
+        info_table.setStyle(self._rl.INFO_TABLE_STYLE)
         
         elements.append(info_table)
-        elements.append(PageBreak())
+        elements.append(self._rl.PageBreak())
         
         return elements
     
     def _create_executive_summary(self, report: ComplianceReport) -> List:
         """Create executive summary section."""
+        inch = self._rl.inch
         elements = []
         
         # Section header
-        header = Paragraph("Executive Summary", self.styles['SectionHeader'])
+        header = self._rl.Paragraph("Executive Summary", self.styles['SectionHeader'])
         elements.append(header)
-        elements.append(Spacer(1, 0.2 * inch))
+        elements.append(self._rl.Spacer(*self._rl.SMALL_SPACE))
         
         # Summary metrics
         if report.summary:
-            summary_data = [
-                ['Metric', 'Value'],
-                ['Total Clauses Analyzed', str(report.summary.total_clauses)],
-                ['Compliant Clauses', str(report.summary.compliant_clauses)],
-                ['Non-Compliant Clauses', str(report.summary.non_compliant_clauses)],
-                ['Partial Compliance', str(report.summary.partial_clauses)],
-                ['High Risk Items', str(report.summary.high_risk_count)],
-                ['Medium Risk Items', str(report.summary.medium_risk_count)],
-                ['Low Risk Items', str(report.summary.low_risk_count)],
-                ['Missing Requirements', str(len(report.missing_requirements))]
-            ]
+            # Table stringifies the counts when drawing
+            summary_data = [['Metric', 'Value']]
+            summary_data.extend(zip(SUMMARY_LABELS, SUMMARY_FIELDS(report.summary)))
+            summary_data.append(['Missing Requirements', len(report.missing_requirements)])
             
-            summary_table = Table(summary_data, colWidths=[3 * inch, 2 * inch])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2e86ab')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-            ]))
+            summary_table = self._rl.Table(summary_data, colWidths=[3 * inch, 2 * inch])
+            summary_table.setStyle(self._rl.SUMMARY_TABLE_STYLE)
             
             elements.append(summary_table)
         
-        elements.append(Spacer(1, 0.3 * inch))
+        elements.append(self._rl.Spacer(*self._rl.LARGE_SPACE))
         
         # Overall assessment
         assessment_text = self._get_assessment_text(report.overall_score)
-        assessment = Paragraph(
+        assessment = self._rl.Paragraph(
             f"<b>Overall Assessment:</b> {assessment_text}",
             self.styles['Normal']
         )
         elements.append(assessment)
-        elements.append(Spacer(1, 0.3 * inch))
+        elements.append(self._rl.Spacer(*self._rl.LARGE_SPACE))
         
         return elements
     
     def _create_compliance_details(self, report: ComplianceReport) -> List:
         """Create detailed compliance results section."""
+        inch = self._rl.inch
         elements = []
         
         # Section header
-        header = Paragraph("Detailed Compliance Results", self.styles['SectionHeader'])
+        header = self._rl.Paragraph("Detailed Compliance Results", self.styles['SectionHeader'])
         elements.append(header)
-        elements.append(Spacer(1, 0.2 * inch))
+        elements.append(self._rl.Spacer(*self._rl.SMALL_SPACE))
+        
+        # Group results by framework in one pass
+        results_by_framework = defaultdict(list)
+        for result in report.clause_results:
+            results_by_framework[result.framework].append(result)
         
-        # Group results by framework
         for framework in report.frameworks_checked:
-            framework_results = [
-                r for r in report.clause_results
-                if r.framework == framework
-            ]
+            framework_results = results_by_framework.get(framework)
             
             if framework_results:
                 # Framework subsection
-                subheader = Paragraph(
+                subheader = self._rl.Paragraph(
                     f"{framework} Compliance",
                     self.styles['SubSection']
                 )
@@ -505,12 +850,9 @@ class PDFReportGenerator:
                 # Create table data
                 table_data = [['Clause ID', 'Type', 'Status', 'Risk', 'Issues']]
                 
-                for result in framework_results[:20]:  # Limit to first 20 for space
-                    issues_preview = (
-                        result.issues[0][:50] + '...'
-                        if result.issues and len(result.issues[0]) > 50
-                        else result.issues[0] if result.issues else 'None'
-                    )
+                shown_results = framework_results[:20]  # Limit to first 20 for space
+                for result in shown_results:
+                    issues_preview = _preview(result.issues[0], 50) if result.issues else 'None'
                     
                     table_data.append([
                         result.clause_id,
@@ -520,63 +862,41 @@ class PDFReportGenerator:
                         issues_preview
                     ])
                 
-                # Create table
-                clause_table = Table(
+                # Create table; LongTable lets reportlab split long tables across pages
+                clause_table = self._rl.LongTable(
                     table_data,
                     colWidths=[0.8 * inch, 1.5 * inch, 1 * inch, 0.8 * inch, 2.4 * inch]
                 )
                 
-                # Style table
-                table_style = [
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2e86ab')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')])
+                # Color-code the risk column with one style command
+                risk_backgrounds = [
+                    self._rl.RISK_COLORS.get(result.risk_level.value, self._rl.RISK_COLORS['Low'])
+                    for result in shown_results
                 ]
                 
-                # Add color coding for risk levels
-                for i, result in enumerate(framework_results[:20], start=1):
-                    if result.risk_level.value == 'High':
-                        table_style.append(
-                            ('BACKGROUND', (3, i), (3, i), colors.HexColor('#ff6b6b'))
-                        )
-                    elif result.risk_level.value == 'Medium':
-                        table_style.append(
-                            ('BACKGROUND', (3, i), (3, i), colors.HexColor('#ffd166'))
-                        )
-                    else:
-                        table_style.append(
-                            ('BACKGROUND', (3, i), (3, i), colors.HexColor('#06d6a0'))
-                        )
-                
-                clause_table.setStyle(TableStyle(table_style))
+                # Shared base style plus this table's risk colors
+                clause_table.setStyle(self._rl.DETAILS_TABLE_STYLE)
+                clause_table.setStyle([('ROWBACKGROUNDS', (3, 1), (3, -1), risk_backgrounds)])
                 elements.append(clause_table)
-                elements.append(Spacer(1, 0.2 * inch))
+                elements.append(self._rl.Spacer(*self._rl.SMALL_SPACE))
         
         return elements
     
     def _create_missing_requirements_section(self, report: ComplianceReport) -> List:
         """Create missing requirements section."""
+        inch = self._rl.inch
         elements = []
         
         # Section header
-        header = Paragraph("Missing Requirements", self.styles['SectionHeader'])
+        header = self._rl.Paragraph("Missing Requirements", self.styles['SectionHeader'])
         elements.append(header)
-        elements.append(Spacer(1, 0.2 * inch))
+        elements.append(self._rl.Spacer(*self._rl.SMALL_SPACE))
         
         # Create table
         table_data = [['Framework', 'Article', 'Clause Type', 'Description']]
         
         for req in report.missing_requirements:
-            desc_preview = (
-                req.description[:80] + '...'
-                if len(req.description) > 80
-                else req.description
-            )
+            desc_preview = _preview(req.description, 80)
             
             table_data.append([
                 req.framework,
@@ -585,35 +905,27 @@ class PDFReportGenerator:
                 desc_preview
             ])
         
-        missing_table = Table(
+        missing_table = self._rl.Table(
             table_data,
             colWidths=[0.8 * inch, 1.2 * inch, 1.5 * inch, 3 * inch]
         )
         
-        missing_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ff6b6b')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#fff0f0')])
-        ]))
+        missing_table.setStyle(self._rl.MISSING_TABLE_STYLE)
         
         elements.append(missing_table)
-        elements.append(Spacer(1, 0.3 * inch))
+        elements.append(self._rl.Spacer(*self._rl.LARGE_SPACE))
         
         return elements
     
     def _create_recommendations_section(self, recommendations: List[Recommendation]) -> List:
         """Create recommendations section."""
+        inch = self._rl.inch
         elements = []
         
         # Section header
-        header = Paragraph("Recommendations", self.styles['SectionHeader'])
+        header = self._rl.Paragraph("Recommendations", self.styles['SectionHeader'])
         elements.append(header)
-        elements.append(Spacer(1, 0.2 * inch))
+        elements.append(self._rl.Spacer(*self._rl.SMALL_SPACE))
         
         # Sort by priority
         sorted_recs = sorted(recommendations, key=lambda r: r.priority)
@@ -622,11 +934,7 @@ class PDFReportGenerator:
         table_data = [['Priority', 'Action', 'Description', 'Reference']]
         
         for rec in sorted_recs[:15]:  # Limit to first 15
-            desc_preview = (
-                rec.description[:60] + '...'
-                if len(rec.description) > 60
-                else rec.description
-            )
+            desc_preview = _preview(rec.description, 60)
             
             table_data.append([
                 rec.get_priority_label(),
@@ -635,39 +943,21 @@ class PDFReportGenerator:
                 rec.regulatory_reference[:30]
             ])
         
-        rec_table = Table(
+        rec_table = self._rl.Table(
             table_data,
             colWidths=[0.8 * inch, 1.2 * inch, 3 * inch, 1.5 * inch]
         )
         
-        rec_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2e86ab')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f8ff')])
-        ]))
+        rec_table.setStyle(self._rl.RECOMMENDATIONS_TABLE_STYLE)
         
         elements.append(rec_table)
-        elements.append(Spacer(1, 0.3 * inch))
+        elements.append(self._rl.Spacer(*self._rl.LARGE_SPACE))
         
         return elements
     
     def _get_assessment_text(self, score: float) -> str:
         """Get assessment text based on score."""
-        if score >= 90:
-            return "Excellent compliance. Minor improvements recommended."
-        elif score >= 80:
-            return "Good compliance. Some areas need attention."
-        elif score >= 70:
-            return "Moderate compliance. Several issues require remediation."
-        elif score >= 60:
-            return "Fair compliance. Significant improvements needed."
-        else:
-            return "Poor compliance. Immediate action required."
+        return ASSESSMENT_TEXTS[bisect_right(ASSESSMENT_THRESHOLDS, score)]
 
 
 class ExportError(Exception):
@@ -1,12 +1,63 @@
 """Google Sheets integration service for contract text extraction."""
 
+import functools
 import logging
 import re
+import threading
 from typing import Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Compiled once for parse_sheet_url, which runs on every URL validation
+_SHEET_URL_PREFIX = 'https://docs.google.com/spreadsheets/d/'
+_SHEET_URL_RE = re.compile(r'https://docs\.google\.com/spreadsheets/d/([a-zA-Z0-9-_]+)')
+_GID_RE = re.compile(r'#gid=(\d+)')
+
+# Every column of the first sheet (ZZZ is the Sheets column limit)
+FIRST_SHEET_RANGE = 'A:ZZZ'
+
+
+# Built API clients per thread: httplib2 connections are not thread-safe
+_thread_services = threading.local()
+
+
+@functools.lru_cache(maxsize=4)
+def _load_credentials(credentials_path: str):
+    """Load service account credentials once per credentials file."""
+    from google.oauth2 import service_account
+    
+    return service_account.Credentials.from_service_account_file(
+        credentials_path,
+        scopes=['https://www.googleapis.com/auth/spreadsheets.readonly']
+    )
+
+
+def _get_sheets_service(credentials_path: str):
+    """
+    Return a Sheets API client for the credentials, reusing this thread's.
+    
+    Args:
+        credentials_path: Path to Google API credentials JSON file
+        
+    Returns:
+        Google Sheets API service resource
+    """
+    services = _thread_services.__dict__.setdefault('by_path', {})
+    service = services.get(credentials_path)
+    if service is None:
+        from googleapiclient.discovery import build
+        
+        # The v4 discovery document ships with the client library, so
+        # there is nothing to fetch or cache on disk
+        service = build(
+            'sheets', 'v4',
+            credentials=_load_credentials(credentials_path),
+            cache_discovery=False
+        )
+        services[credentials_path] = service
+    return service
+
 
 class GoogleSheetsError(Exception):
     """Base exception for Google Sheets errors."""
@@ -46,25 +97,15 @@ class GoogleSheetsService:
         if self._service is not None:
             return
         
-        try:
-            from google.oauth2 import service_account
-            from googleapiclient.discovery import build
-            
-            # Check if credentials file exists
-            if not Path(self.credentials_path).exists():
-                raise AuthenticationError(
-                    f"Google API credentials not found at {self.credentials_path}. "
-                    "Please download credentials from Google Cloud Console and place them in the config folder."
-                )
-            
-            # Load credentials
-            credentials = service_account.Credentials.from_service_account_file(
-                self.credentials_path,
-                scopes=['https://www.googleapis.com/auth/spreadsheets.readonly']
+        # Check if credentials file exists
+        if not Path(self.credentials_path).exists():
+            raise AuthenticationError(
+                f"Google API credentials not found at {self.credentials_path}. "
+                "Please download credentials from Google Cloud Console and place them in the config folder."
             )
-            
-            # Build service
-            self._service = build('sheets', 'v4', credentials=credentials)
+        
+        try:
+            self._service = _get_sheets_service(self.credentials_path)
             self.logger.info("Google Sheets service initialized successfully")
             
         except ImportError:
@@ -91,9 +132,7 @@ class GoogleSheetsService:
         # Pattern for Google Sheets URLs
         # https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit#gid={sheet_id}
         # https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit
-        
-        pattern = r'https://docs\.google\.com/spreadsheets/d/([a-zA-Z0-9-_]+)'
-        match = re.search(pattern, url)
+        match = _SHEET_URL_RE.search(url)
         
         if not match:
             raise GoogleSheetsError(
@@ -105,7 +144,7 @@ class GoogleSheetsService:
         
         # Try to extract sheet name from URL (if present)
         sheet_name = None
-        gid_match = re.search(r'#gid=(\d+)', url)
+        gid_match = _GID_RE.search(url)
         if gid_match:
             # We have a gid, but we'll need to look up the sheet name
             # For now, we'll use the default sheet
@@ -152,24 +191,18 @@ class GoogleSheetsService:
             elif cell_range:
                 range_str = cell_range
             else:
-                # Get first sheet name
-                sheet_metadata = self._service.spreadsheets().get(
-                    spreadsheetId=spreadsheet_id
-                ).execute()
-                
-                sheets = sheet_metadata.get('sheets', [])
-                if not sheets:
-                    raise SheetNotFoundError("No sheets found in the spreadsheet")
-                
-                first_sheet_name = sheets[0]['properties']['title']
-                range_str = first_sheet_name
+                # A range without a sheet name resolves against the first
+                # sheet, which saves a metadata round trip to look up its title
+                range_str = FIRST_SHEET_RANGE
             
             self.logger.info(f"Reading from spreadsheet {spreadsheet_id}, range: {range_str}")
             
-            # Read data from sheet
+            # Read data from sheet; only the cell values are needed, so the
+            # rest of the ValueRange envelope is projected away
             result = self._service.spreadsheets().values().get(
                 spreadsheetId=spreadsheet_id,
-                range=range_str
+                range=range_str,
+                fields='values'
             ).execute()
             
             values = result.get('values', [])
@@ -180,8 +213,12 @@ class GoogleSheetsService:
             # Convert rows to text
             text_lines = []
             for row in values:
-                # Join cells in row with space
-                row_text = ' '.join(str(cell) for cell in row if cell)
+                # Join cells in row with space; formatted values are already
+                # strings, so the non-empty ones can be joined directly
+                try:
+                    row_text = ' '.join(filter(None, row))
+                except TypeError:
+                    row_text = ' '.join(str(cell) for cell in row if cell)
                 if row_text.strip():
                     text_lines.append(row_text)
             
@@ -207,11 +244,8 @@ class GoogleSheetsService:
         Returns:
             True if URL is valid
         """
-        try:
-            self.parse_sheet_url(url)
-            return True
-        except GoogleSheetsError:
-            return False
+        # Cheap substring reject first; no exception or gid lookup for a bool
+        return _SHEET_URL_PREFIX in url and _SHEET_URL_RE.search(url) is not None
     
     def test_connection(self) -> bool:
         """
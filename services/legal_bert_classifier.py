@@ -1,6 +1,7 @@
 """
 LegalBERT-based clause classification service.
 """
+import functools
 import streamlit as st
 import torch
 from transformers import AutoTokenizer, AutoModel
@@ -8,25 +9,44 @@ from typing import Tuple, List
 import numpy as np
 from utils.logger import get_logger
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = get_logger(__name__)
 
+# BERT base hidden size; read-only zero row shared by every embedding fallback
+BERT_EMBEDDING_DIM = 768
+_ZERO_EMBEDDING = np.zeros(BERT_EMBEDDING_DIM, dtype=np.float32)
+_ZERO_EMBEDDING.setflags(write=False)
+
+
+@functools.lru_cache(maxsize=512)
+def _lowercase(text: str) -> str:
+    """Lowercase a clause once; Streamlit reruns reclassify the same clauses."""
+    return text.lower()
+
 
 class LegalBERTClassifier:
     """LegalBERT-based clause classification."""
     
-    def __init__(self, model_name: str = "nlpaueb/legal-bert-base-uncased"):
+    def __init__(self, model_name: str = "nlpaueb/legal-bert-base-uncased", quantize: bool = True):
         """
         Initialize LegalBERT classifier.
         
         Args:
             model_name: Hugging Face model identifier
+            quantize: Load half precision weights on GPU, or dynamically
+                      quantize the Linear layers to int8 on CPU
         """
         self.model_name = model_name
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         logger.info(f"Using device: {self.device}")
         
         # Load model and tokenizer with caching
-        self.model = self._load_model()
+        self.model = self._load_model(quantize)
         self.tokenizer = self._load_tokenizer()
         
         # Define clause type mappings for classification
@@ -72,20 +92,43 @@ class LegalBERTClassifier:
                 "authorized use", "permitted disclosure"
             ]
         }
+        
+        # One automaton over every keyword so a clause is scanned once
+        self._keyword_automaton = self._build_keyword_automaton()
+        
+        # Clause types each keyword counts towards, for scoring automaton hits
+        self._keyword_types = {}
+        for clause_type, keywords in self.clause_keywords.items():
+            for keyword in keywords:
+                self._keyword_types.setdefault(keyword, []).append(clause_type)
     
     @st.cache_resource
-    def _load_model(_self):
+    def _load_model(_self, quantize: bool = True):
         """
         Load LegalBERT model with Streamlit caching.
         
+        Args:
+            quantize: Use float16 weights on GPU or int8 dynamic quantization on CPU
+            
         Returns:
             Loaded model
         """
         try:
             logger.info(f"Loading LegalBERT model: {_self.model_name}")
-            model = AutoModel.from_pretrained(_self.model_name)
+            on_gpu = _self.device.type == "cuda"
+            model = AutoModel.from_pretrained(
+                _self.model_name,
+                torch_dtype=torch.float16 if quantize and on_gpu else torch.float32
+            )
             model.to(_self.device)
             model.eval()
+            
+            if quantize and not on_gpu:
+                # int8 weights for the Linear layers, activations quantized on the fly
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            
             logger.info("LegalBERT model loaded successfully")
             return model
         except Exception as e:
@@ -109,6 +152,26 @@ class LegalBERTClassifier:
             logger.error(f"Error loading tokenizer: {e}")
             raise
     
+    def _build_keyword_automaton(self):
+        """
+        Build an Aho-Corasick automaton over all classification keywords.
+        
+        Returns:
+            Automaton whose matches yield the keyword, or None if
+            pyahocorasick is not installed
+        """
+        if not AHOCORASICK_AVAILABLE:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keywords in self.clause_keywords.values():
+            for keyword in keywords:
+                # A keyword can belong to several clause types, so store the
+                # keyword itself and score each type against the found set
+                automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+    
     def _keyword_based_classification(self, text: str) -> List[Tuple[str, float]]:
         """
         Perform keyword-based classification as a fallback or supplement.
@@ -119,15 +182,28 @@ class LegalBERTClassifier:
         Returns:
             List of (clause_type, score) tuples sorted by score
         """
-        text_lower = text.lower()
-        scores = {}
+        text_lower = _lowercase(text)
         
-        for clause_type, keywords in self.clause_keywords.items():
-            # Count keyword matches
-            matches = sum(1 for keyword in keywords if keyword in text_lower)
-            # Normalize by number of keywords
-            score = matches / len(keywords) if keywords else 0.0
-            scores[clause_type] = score
+        if self._keyword_automaton is not None:
+            # Single pass over the text; each keyword counts once however often it appears
+            found = {keyword for _, keyword in self._keyword_automaton.iter(text_lower)}
+            
+            # Credit each hit to its clause types rather than testing every keyword
+            matches = dict.fromkeys(self.clause_keywords, 0)
+            for keyword in found:
+                for clause_type in self._keyword_types[keyword]:
+                    matches[clause_type] += 1
+        else:
+            matches = {
+                clause_type: sum(1 for keyword in keywords if keyword in text_lower)
+                for clause_type, keywords in self.clause_keywords.items()
+            }
+        
+        # Normalize by number of keywords
+        scores = {
+            clause_type: matches[clause_type] / len(keywords) if keywords else 0.0
+            for clause_type, keywords in self.clause_keywords.items()
+        }
         
         # Sort by score descending
         sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
@@ -146,28 +222,7 @@ class LegalBERTClassifier:
             where alternatives is a list of (type, score) tuples
         """
         try:
-            # Use keyword-based classification
-            # In a production system, this would use the actual LegalBERT model
-            # for sequence classification. For now, we use keyword matching
-            # as a practical implementation.
-            
-            keyword_scores = self._keyword_based_classification(text)
-            
-            if not keyword_scores or keyword_scores[0][1] == 0.0:
-                # No matches found, classify as "Other"
-                predicted_type = "Other"
-                confidence = 0.5
-                alternatives = [("Other", 0.5)]
-            else:
-                predicted_type = keyword_scores[0][0]
-                # Scale confidence based on keyword match ratio
-                raw_score = keyword_scores[0][1]
-                confidence = min(0.95, 0.5 + (raw_score * 0.45))  # Scale to 0.5-0.95 range
-                
-                # Get top_k alternatives
-                alternatives = [(t, min(0.95, 0.5 + (s * 0.45))) 
-                               for t, s in keyword_scores[:top_k]]
-            
+            predicted_type, confidence, alternatives = self._classify(text, top_k)
             logger.info(f"Classified clause as '{predicted_type}' with confidence {confidence:.2f}")
             return predicted_type, confidence, alternatives
             
@@ -176,6 +231,78 @@ class LegalBERTClassifier:
             # Return safe default
             return "Other", 0.5, [("Other", 0.5)]
     
+    def predict_batch(
+        self,
+        texts: List[str],
+        top_k: int = 3
+    ) -> List[Tuple[str, float, List[Tuple[str, float]]]]:
+        """
+        Predict clause types for many texts in one call.
+        
+        Each text is classified as in predict(), but a failure only replaces
+        that text's prediction with the safe default and the batch is logged
+        once instead of per clause. Repeated texts (boilerplate clauses) are
+        classified once.
+        
+        Args:
+            texts: Clause texts to classify
+            top_k: Number of alternative predictions to return per text
+            
+        Returns:
+            List of (predicted_type, confidence, alternatives) tuples in input order
+        """
+        by_text = {}
+        predictions = []
+        for text in texts:
+            prediction = by_text.get(text)
+            if prediction is None:
+                try:
+                    prediction = self._classify(text, top_k)
+                except Exception as e:
+                    logger.error(f"Error in clause classification: {e}")
+                    prediction = ("Other", 0.5, [("Other", 0.5)])
+                by_text[text] = prediction
+            
+            # Each clause gets its own alternatives list
+            predicted_type, confidence, alternatives = prediction
+            predictions.append((predicted_type, confidence, list(alternatives)))
+        
+        logger.info(f"Classified {len(predictions)} clauses ({len(by_text)} unique)")
+        return predictions
+    
+    def _classify(self, text: str, top_k: int) -> Tuple[str, float, List[Tuple[str, float]]]:
+        """
+        Classify one text from its keyword scores.
+        
+        Args:
+            text: Clause text to classify
+            top_k: Number of alternative predictions to return
+            
+        Returns:
+            Tuple of (predicted_type, confidence, alternatives)
+        """
+        # Use keyword-based classification
+        # In a production system, this would use the actual LegalBERT model
+        # for sequence classification. For now, we use keyword matching
+        # as a practical implementation.
+        
+        keyword_scores = self._keyword_based_classification(text)
+        
+        if not keyword_scores or keyword_scores[0][1] == 0.0:
+            # No matches found, classify as "Other"
+            return "Other", 0.5, [("Other", 0.5)]
+        
+        predicted_type = keyword_scores[0][0]
+        # Scale confidence based on keyword match ratio
+        raw_score = keyword_scores[0][1]
+        confidence = min(0.95, 0.5 + (raw_score * 0.45))  # Scale to 0.5-0.95 range
+        
+        # Get top_k alternatives
+        alternatives = [(t, min(0.95, 0.5 + (s * 0.45))) 
+                       for t, s in keyword_scores[:top_k]]
+        
+        return predicted_type, confidence, alternatives
+    
     def get_embeddings(self, text: str) -> np.ndarray:
         """
         Generate embeddings for text using LegalBERT.
@@ -184,29 +311,54 @@ class LegalBERTClassifier:
             text: Text to embed
             
         Returns:
-            Embedding vector as numpy array
+            Embedding vector as numpy array (read-only zeros on failure)
+        """
+        return self.get_embeddings_batch([text])[0]
+    
+    def get_embeddings_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Generate LegalBERT embeddings for many texts, one forward pass per batch.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Number of texts padded together per forward pass
+            
+        Returns:
+            Array of shape (len(texts), hidden_size) with one [CLS] embedding per
+            text; on failure a read-only zero array that must not be modified
         """
         try:
-            # Tokenize
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True
-            )
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            # Batch texts of similar length so little attention is spent on padding
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            
+            batches = []
+            for start in range(0, len(texts), batch_size):
+                # Tokenize the whole batch, padded to its longest text
+                inputs = self.tokenizer(
+                    [texts[i] for i in order[start:start + batch_size]],
+                    return_tensors="pt",
+                    truncation=True,
+                    max_length=512,
+                    padding=True
+                )
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                
+                # Get embeddings
+                with torch.inference_mode():
+                    outputs = self.model(**inputs)
+                    # Use [CLS] token embedding (first token), float32 even for a half precision model
+                    batches.append(outputs.last_hidden_state[:, 0, :].float().cpu().numpy())
             
-            # Get embeddings
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                # Use [CLS] token embedding (first token)
-                embeddings = outputs.last_hidden_state[:, 0, :].cpu().numpy()
+            if not batches:
+                return np.zeros((0, BERT_EMBEDDING_DIM), dtype=np.float32)
             
+            # Scatter rows back to input order
+            embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+            embeddings[order] = np.concatenate(batches)
             logger.debug(f"Generated embeddings with shape: {embeddings.shape}")
-            return embeddings[0]
+            return embeddings
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
-            # Return zero vector as fallback
-            return np.zeros(768)  # BERT base dimension
+            # Return zero vectors as fallback, broadcast from the shared row without allocating
+            return np.broadcast_to(_ZERO_EMBEDDING, (len(texts), BERT_EMBEDDING_DIM))
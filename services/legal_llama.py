@@ -3,8 +3,15 @@ LegalLLaMA service for generating recommendations and compliant clause text.
 Implements LLaMA model integration with GPU detection and caching.
 """
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig, GenerationConfig
 from typing import Optional, Dict, Any
+from collections import OrderedDict
+from pathlib import Path
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
 import time
 
 from config.settings import config
@@ -12,6 +19,64 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Sampling temperature and length for compliance analysis; part of the response cache key
+ANALYSIS_TEMPERATURE = 0.3
+ANALYSIS_MAX_TOKENS = 256
+
+# Persisted analyses older than this are regenerated
+RESPONSE_CACHE_TTL = 24 * 60 * 60  # seconds
+
+
+class _DiskResponseStore:
+    """
+    SQLite-backed store of compliance analyses that survives app restarts.
+    
+    Analyses are stored as JSON with their creation time; entries older
+    than the TTL are treated as missing and overwritten on the next put.
+    A lock serializes access to the connection, which every session thread
+    shares.
+    """
+    
+    def __init__(self, directory: Path, ttl: float = RESPONSE_CACHE_TTL):
+        """
+        Open (or create) the store.
+        
+        Args:
+            directory: Directory holding the SQLite file
+            ttl: Maximum age of a usable entry in seconds
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(directory / "responses.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, created REAL NOT NULL, analysis TEXT NOT NULL)"
+        )
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored analysis for key, or None if missing or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT analysis FROM responses WHERE key = ? AND created >= ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+    
+    def put(self, key: str, analysis: Dict[str, Any]):
+        """Store an analysis, replacing any older entry."""
+        record = json.dumps(analysis)
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, created, analysis) VALUES (?, ?, ?)",
+                    (key, time.time(), record)
+                )
+                self._db.commit()
+            except sqlite3.Error:
+                self._db.rollback()
+                raise
+
 
 class LegalLLaMA:
     """
@@ -24,7 +89,9 @@ class LegalLLaMA:
         model_name: Optional[str] = None,
         use_gpu: Optional[bool] = None,
         max_tokens: Optional[int] = None,
-        temperature: Optional[float] = None
+        temperature: Optional[float] = None,
+        response_cache_max: int = 256,
+        response_cache_dir: Optional[str] = None
     ):
         """
         Initialize LegalLLaMA model.
@@ -34,6 +101,10 @@ class LegalLLaMA:
             use_gpu: Whether to use GPU if available (default from config)
             max_tokens: Maximum tokens to generate (default from config)
             temperature: Sampling temperature (default from config)
+            response_cache_max: Maximum number of compliance analyses kept
+                                in memory (0 disables the cache)
+            response_cache_dir: Optional directory for a persistent analysis
+                                cache that survives restarts (disabled if None)
         """
         logger.info("Initializing LegalLLaMA model...")
         
@@ -51,8 +122,22 @@ class LegalLLaMA:
         # Initialize model and tokenizer
         self.model = None
         self.tokenizer = None
+        self.generation_config = None
+        self._encode_prompt = functools.lru_cache(maxsize=128)(self._tokenize_prompt)
         self._load_model()
         
+        # Compliance analyses keyed by prompt content, LRU in memory with an
+        # optional persistent second level
+        self.response_cache_max = response_cache_max
+        self._response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._response_lock = threading.Lock()
+        self._response_store: Optional[_DiskResponseStore] = None
+        if response_cache_dir:
+            try:
+                self._response_store = _DiskResponseStore(Path(response_cache_dir))
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Disk response cache unavailable: {e}")
+        
         logger.info("LegalLLaMA initialized successfully")
     
     def _detect_device(self) -> str:
@@ -92,6 +177,8 @@ class LegalLLaMA:
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
             
+            self.generation_config = self._build_generation_config()
+            
             logger.info("Tokenizer loaded successfully")
             
             # Load model with appropriate settings
@@ -99,17 +186,32 @@ class LegalLLaMA:
                 'cache_dir': config.models.cache_dir,
                 'trust_remote_code': True,
                 'torch_dtype': torch.float16 if self.device == "cuda" else torch.float32,
-                'low_cpu_mem_usage': True
+                'low_cpu_mem_usage': True,
+                'attn_implementation': 'sdpa'
             }
             
             # Add device map for GPU
             if self.device == "cuda":
                 load_kwargs['device_map'] = 'auto'
+                
+                # Decode is memory-bound; int8/nf4 weights halve or quarter the bytes read per token
+                quantization_config = self._build_quantization_config()
+                if quantization_config is not None:
+                    load_kwargs['quantization_config'] = quantization_config
             
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_name,
-                **load_kwargs
-            )
+            try:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    **load_kwargs
+                )
+            except (ValueError, ImportError) as e:
+                # Older transformers releases and some remote-code models reject SDPA
+                logger.warning(f"SDPA attention unavailable, loading default attention: {e}")
+                del load_kwargs['attn_implementation']
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    **load_kwargs
+                )
             
             # Move to device if CPU
             if self.device == "cpu":
@@ -118,6 +220,11 @@ class LegalLLaMA:
             # Set to evaluation mode
             self.model.eval()
             
+            # Fuse the decoder forward on GPU; generate() keeps its Python loop.
+            # bitsandbytes layers are left eager.
+            if self.device == "cuda" and 'quantization_config' not in load_kwargs:
+                self._compile_forward()
+            
             elapsed = time.time() - start_time
             logger.info(f"Model loaded successfully in {elapsed:.2f}s")
             
@@ -125,6 +232,74 @@ class LegalLLaMA:
             logger.error(f"Failed to load LLaMA model: {e}", exc_info=True)
             raise RuntimeError(f"Failed to load LLaMA model: {e}")
     
+    def _build_quantization_config(self) -> Optional[BitsAndBytesConfig]:
+        """
+        Build the bitsandbytes weight quantization set in config.
+        
+        Returns:
+            BitsAndBytesConfig for 8bit or 4bit (NF4) weights, or None to
+            load float16 weights
+        """
+        mode = config.models.quantization
+        if mode == '8bit':
+            return BitsAndBytesConfig(load_in_8bit=True)
+        if mode == '4bit':
+            return BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type='nf4',
+                bnb_4bit_compute_dtype=torch.float16
+            )
+        if mode != 'none':
+            logger.warning(f"Unknown quantization '{mode}', loading float16 weights")
+        return None
+    
+    def _compile_forward(self):
+        """
+        Compile the model forward pass with torch.compile.
+        
+        The KV cache grows by one position per token, so the graph is
+        compiled with dynamic shapes instead of CUDA-graph capture.
+        torch.compile is lazy, so one warm-up forward runs here: model
+        load pays the compile time, and a Dynamo/Inductor failure restores
+        the eager forward instead of failing every generate(). Set
+        TORCHINDUCTOR_CACHE_DIR to reuse kernels across restarts.
+        """
+        if not hasattr(torch, 'compile'):
+            return
+        
+        eager_forward = self.model.forward
+        try:
+            self.model.forward = torch.compile(eager_forward, dynamic=True)
+            warmup = self._tokenize_prompt("Warm-up")
+            with torch.no_grad():
+                self.model(**warmup)
+            logger.info("Compiled LLaMA forward pass with torch.compile")
+        except Exception as e:
+            self.model.forward = eager_forward
+            logger.warning(f"torch.compile failed, using eager forward: {e}")
+    
+    def _build_generation_config(self) -> GenerationConfig:
+        """
+        Build the default generation settings once per loaded tokenizer.
+        
+        Sampling is single-beam with the KV cache enabled, so each new
+        token attends over cached keys/values instead of re-running the
+        whole prefix.
+        
+        Returns:
+            GenerationConfig shared by every generate() call
+        """
+        return GenerationConfig(
+            max_new_tokens=self.max_tokens,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            do_sample=True,
+            num_beams=1,
+            use_cache=True,
+            pad_token_id=self.tokenizer.pad_token_id,
+            eos_token_id=self.tokenizer.eos_token_id
+        )
+    
     def generate(
         self,
         prompt: str,
@@ -162,25 +337,17 @@ class LegalLLaMA:
                 f"temperature={temp}, top_p={nucleus_p}"
             )
             
-            # Tokenize input
-            inputs = self.tokenizer(
-                prompt,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=config.models.max_length
-            ).to(self.device)
+            # Tokenize input (repeated prompts reuse their encoding)
+            inputs = self._encode_prompt(prompt)
             
             # Generate
             with torch.no_grad():
                 outputs = self.model.generate(
                     **inputs,
+                    generation_config=self.generation_config,
                     max_new_tokens=max_new_tokens,
                     temperature=temp,
-                    top_p=nucleus_p,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.pad_token_id,
-                    eos_token_id=self.tokenizer.eos_token_id
+                    top_p=nucleus_p
                 )
             
             # Decode output
@@ -202,6 +369,27 @@ class LegalLLaMA:
             logger.error(f"Error during text generation: {e}", exc_info=True)
             raise RuntimeError(f"Text generation failed: {e}")
     
+    def _tokenize_prompt(self, prompt: str):
+        """
+        Tokenize a prompt and move it to the model device.
+        
+        Wrapped per instance in an LRU cache; the returned tensors are
+        shared between calls and must not be modified in place.
+        
+        Args:
+            prompt: Prompt text
+            
+        Returns:
+            BatchEncoding with input_ids and attention_mask
+        """
+        return self.tokenizer(
+            prompt,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=config.models.max_length
+        ).to(self.device)
+    
     def analyze_compliance(
         self,
         clause_text: str,
@@ -217,15 +405,20 @@ class LegalLLaMA:
         Returns:
             Dictionary with analysis results
         """
+        prompt = self._build_analysis_prompt(clause_text, regulatory_context)
+        cache_key = self._response_key(prompt)
+        cached = self._get_cached_analysis(cache_key)
+        if cached is not None:
+            logger.debug("Compliance analysis served from cache")
+            return cached
+        
         try:
-            prompt = self._build_analysis_prompt(clause_text, regulatory_context)
-            
             logger.debug("Performing compliance analysis with LLaMA")
             
             response = self.generate(
                 prompt,
-                max_tokens=256,
-                temperature=0.3  # Lower temperature for more focused analysis
+                max_tokens=ANALYSIS_MAX_TOKENS,
+                temperature=ANALYSIS_TEMPERATURE  # Lower temperature for more focused analysis
             )
             
             # Parse response (simplified - could be enhanced with structured output)
@@ -236,6 +429,8 @@ class LegalLLaMA:
                 'confidence': 0.8  # Placeholder - could be extracted from response
             }
             
+            self._store_analysis(cache_key, analysis)
+            
             return analysis
             
         except Exception as e:
@@ -247,6 +442,79 @@ class LegalLLaMA:
                 'confidence': 0.0
             }
     
+    def _response_key(self, prompt: str) -> str:
+        """
+        Build the cache key for a compliance analysis.
+        
+        Args:
+            prompt: Full analysis prompt, so template changes miss the cache
+            
+        Returns:
+            SHA-256 hex digest of the model, sampling settings and prompt
+        """
+        material = "\x1f".join((
+            self.model_name,
+            repr(ANALYSIS_TEMPERATURE),
+            repr(self.top_p),
+            str(ANALYSIS_MAX_TOKENS),
+            prompt
+        ))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _copy_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy an analysis so callers cannot mutate the cached one."""
+        return {**analysis, 'issues': list(analysis['issues'])}
+    
+    def _get_cached_analysis(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an analysis in memory, then in the disk cache.
+        
+        Args:
+            key: Key from _response_key
+            
+        Returns:
+            Copy of the cached analysis, or None on a miss or cache failure
+        """
+        with self._response_lock:
+            analysis = self._response_cache.get(key)
+            if analysis is not None:
+                self._response_cache.move_to_end(key)
+        if analysis is not None:
+            return self._copy_analysis(analysis)
+        
+        if self._response_store is None:
+            return None
+        try:
+            analysis = self._response_store.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Compliance analysis cache lookup failed: {e}")
+            return None
+        if analysis is None:
+            return None
+        
+        self._remember_analysis(key, analysis)
+        return self._copy_analysis(analysis)
+    
+    def _store_analysis(self, key: str, analysis: Dict[str, Any]):
+        """Cache a freshly generated analysis in memory and, if enabled, on disk."""
+        self._remember_analysis(key, self._copy_analysis(analysis))
+        if self._response_store is not None:
+            try:
+                self._response_store.put(key, analysis)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist compliance analysis: {e}")
+    
+    def _remember_analysis(self, key: str, analysis: Dict[str, Any]):
+        """Insert into the in-memory LRU, evicting the oldest entry when full."""
+        if self.response_cache_max <= 0:
+            return
+        with self._response_lock:
+            self._response_cache[key] = analysis
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.response_cache_max:
+                self._response_cache.popitem(last=False)
+    
     def _build_analysis_prompt(
         self,
         clause_text: str,
@@ -317,7 +585,8 @@ Response:"""
         }
     
     def clear_cache(self):
-        """Clear GPU cache if using CUDA."""
+        """Clear cached prompt encodings and the GPU cache if using CUDA."""
+        self._encode_prompt.cache_clear()
         if self.device == "cuda":
             torch.cuda.empty_cache()
             logger.info("GPU cache cleared")
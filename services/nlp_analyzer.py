@@ -1,11 +1,15 @@
 """
 NLP Analyzer orchestrator that coordinates clause classification and embedding generation.
 """
-from typing import List, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Union
+import numpy as np
 from models.clause import Clause
 from models.clause_analysis import ClauseAnalysis
 from services.legal_bert_classifier import LegalBERTClassifier
-from services.embedding_generator import EmbeddingGenerator
+from services.embedding_generator import DEFAULT_MODEL_NAME, EmbeddingGenerator
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,7 +25,8 @@ class NLPAnalyzer:
         self,
         classifier: Optional[LegalBERTClassifier] = None,
         embedding_generator: Optional[EmbeddingGenerator] = None,
-        confidence_threshold: float = 0.75
+        confidence_threshold: float = 0.75,
+        cache_dir: Optional[str] = None
     ):
         """
         Initialize NLP Analyzer.
@@ -30,12 +35,34 @@ class NLPAnalyzer:
             classifier: LegalBERT classifier instance (creates new if None)
             embedding_generator: Embedding generator instance (creates new if None)
             confidence_threshold: Minimum confidence for predictions (default 0.75)
+            cache_dir: Optional directory for persistent analysis caches; a
+                       generator created here keeps its clause embeddings there
+                       across runs (disabled if None)
         """
         self.classifier = classifier or LegalBERTClassifier()
-        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        self.embedding_generator = embedding_generator or self._create_embedding_generator(cache_dir)
         self.confidence_threshold = confidence_threshold
         logger.info(f"NLPAnalyzer initialized with confidence threshold: {confidence_threshold}")
     
+    @staticmethod
+    def _create_embedding_generator(cache_dir: Optional[str]) -> EmbeddingGenerator:
+        """
+        Create the default embedding generator, with a disk cache if requested.
+        
+        Args:
+            cache_dir: Root cache directory, or None for an in-memory cache only
+            
+        Returns:
+            EmbeddingGenerator instance
+        """
+        if not cache_dir:
+            return EmbeddingGenerator()
+        
+        # One store per model: the store is keyed by text only, so vectors
+        # from a different model must never be read back
+        disk_cache_dir = Path(cache_dir) / "embeddings" / DEFAULT_MODEL_NAME.replace("/", "--")
+        return EmbeddingGenerator(model_name=DEFAULT_MODEL_NAME, disk_cache_dir=str(disk_cache_dir))
+    
     def analyze_clause(self, clause: Clause) -> ClauseAnalysis:
         """
         Analyze a single clause with classification and embedding.
@@ -87,14 +114,14 @@ class NLPAnalyzer:
     def analyze_clauses(
         self,
         clauses: List[Clause],
-        batch_size: int = 32
+        batch_size: Optional[int] = None
     ) -> List[ClauseAnalysis]:
         """
         Analyze multiple clauses with batch processing for efficiency.
         
         Args:
             clauses: List of clauses to analyze
-            batch_size: Batch size for embedding generation
+            batch_size: Batch size for embedding generation (default: adaptive)
             
         Returns:
             List of ClauseAnalysis results
@@ -106,64 +133,37 @@ class NLPAnalyzer:
                 logger.warning("No clauses provided for analysis")
                 return []
             
-            analyses = []
-            
-            # Step 1: Classify all clauses
-            logger.info("Step 1: Classifying clauses...")
-            classifications = []
-            for clause in clauses:
-                try:
-                    clause_type, confidence, alternatives = self.classifier.predict(clause.text)
-                    classifications.append((clause_type, confidence, alternatives))
-                    
-                    # Log low confidence predictions
-                    if confidence < self.confidence_threshold:
-                        logger.warning(
-                            f"Low confidence ({confidence:.2f}) for clause {clause.clause_id}"
-                        )
-                except Exception as e:
-                    logger.error(f"Error classifying clause {clause.clause_id}: {e}")
-                    classifications.append(("Other", 0.5, [("Other", 0.5)]))
-            
-            # Step 2: Generate embeddings in batch
-            logger.info("Step 2: Generating embeddings in batch...")
             clause_texts = [clause.text for clause in clauses]
-            try:
-                embeddings = self.embedding_generator.generate_embeddings_batch(
-                    clause_texts,
-                    use_cache=True,
-                    batch_size=batch_size
+            
+            # Embeddings run in a worker thread (the model releases the GIL
+            # in its forward passes) while clauses are classified here
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                logger.info("Step 1: Generating embeddings in batch...")
+                embeddings_future = executor.submit(
+                    self._embed_clauses, clauses, clause_texts, batch_size
                 )
-            except Exception as e:
-                logger.error(f"Error in batch embedding generation: {e}")
-                # Fallback to individual embedding generation
-                embeddings = []
-                for clause in clauses:
-                    try:
-                        emb = self.embedding_generator.generate_embedding(clause.text)
-                        embeddings.append(emb)
-                    except Exception as emb_error:
-                        logger.error(f"Error generating embedding for {clause.clause_id}: {emb_error}")
-                        embeddings.append(None)
+                
+                logger.info("Step 2: Classifying clauses...")
+                classifications = self._classify_clauses(clauses, clause_texts)
+                
+                embeddings = embeddings_future.result()
             
-            # Step 3: Combine results into ClauseAnalysis objects
+            # Step 3: Combine results into ClauseAnalysis objects; both
+            # helpers return exactly one entry per clause
             logger.info("Step 3: Combining results...")
-            for clause, (clause_type, confidence, alternatives), embedding in zip(
-                clauses, classifications, embeddings
-            ):
-                try:
-                    analysis = ClauseAnalysis(
-                        clause_id=clause.clause_id,
-                        clause_text=clause.text,
-                        clause_type=clause_type,
-                        confidence_score=confidence,
-                        embeddings=embedding,
-                        alternative_types=alternatives
-                    )
-                    analyses.append(analysis)
-                except Exception as e:
-                    logger.error(f"Error creating analysis for clause {clause.clause_id}: {e}")
-                    analyses.append(self._create_fallback_analysis(clause, str(e)))
+            analyses = [
+                ClauseAnalysis(
+                    clause_id=clause.clause_id,
+                    clause_text=clause.text,
+                    clause_type=clause_type,
+                    confidence_score=confidence,
+                    embeddings=embedding,
+                    alternative_types=alternatives
+                )
+                for clause, (clause_type, confidence, alternatives), embedding in zip(
+                    clauses, classifications, embeddings
+                )
+            ]
             
             # Log summary statistics
             low_confidence_count = sum(
@@ -181,6 +181,87 @@ class NLPAnalyzer:
             # Return fallback analyses for all clauses
             return [self._create_fallback_analysis(clause, str(e)) for clause in clauses]
     
+    def _classify_clauses(self, clauses: List[Clause], clause_texts: List[str]) -> list:
+        """
+        Classify clauses in one batch call, falling back to one at a time.
+        
+        Args:
+            clauses: Clauses being analyzed
+            clause_texts: Text of each clause
+            
+        Returns:
+            List of (clause_type, confidence, alternatives) per clause
+        """
+        try:
+            classifications = self.classifier.predict_batch(clause_texts)
+            if len(classifications) != len(clauses):
+                raise ValueError(
+                    f"expected {len(clauses)} classifications, got {len(classifications)}"
+                )
+        except Exception as e:
+            logger.error(f"Error in batch classification: {e}")
+            # Fallback to classifying clauses one at a time
+            classifications = []
+            for clause in clauses:
+                try:
+                    classifications.append(self.classifier.predict(clause.text))
+                except Exception as clf_error:
+                    logger.error(f"Error classifying clause {clause.clause_id}: {clf_error}")
+                    classifications.append(("Other", 0.5, [("Other", 0.5)]))
+        
+        # Log low confidence predictions
+        for clause, (_, confidence, _) in zip(clauses, classifications):
+            if confidence < self.confidence_threshold:
+                logger.warning(
+                    f"Low confidence ({confidence:.2f}) for clause {clause.clause_id}"
+                )
+        
+        return classifications
+    
+    def _embed_clauses(
+        self,
+        clauses: List[Clause],
+        clause_texts: List[str],
+        batch_size: Optional[int]
+    ) -> Union[np.ndarray, list]:
+        """
+        Generate clause embeddings in batch, falling back to one at a time.
+        
+        The batch path fills one contiguous (N, D) matrix, so each clause's
+        embedding is a row view into a single allocation rather than a
+        separate array.
+        
+        Args:
+            clauses: Clauses being analyzed
+            clause_texts: Text of each clause
+            batch_size: Batch size for embedding generation (default: adaptive)
+            
+        Returns:
+            (N, D) embedding matrix, or a list of embeddings per clause
+            (None where generation failed) on the fallback path
+        """
+        try:
+            embeddings = self.embedding_generator.generate_embeddings_batch(
+                clause_texts,
+                use_cache=True,
+                batch_size=batch_size,
+                return_matrix=True
+            )
+            if len(embeddings) != len(clauses):
+                raise ValueError(f"expected {len(clauses)} embeddings, got {len(embeddings)}")
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error in batch embedding generation: {e}")
+            # Fallback to individual embedding generation
+            embeddings = []
+            for clause in clauses:
+                try:
+                    embeddings.append(self.embedding_generator.generate_embedding(clause.text))
+                except Exception as emb_error:
+                    logger.error(f"Error generating embedding for {clause.clause_id}: {emb_error}")
+                    embeddings.append(None)
+            return embeddings
+    
     def get_low_confidence_clauses(
         self,
         analyses: List[ClauseAnalysis]
@@ -275,18 +356,15 @@ class NLPAnalyzer:
                 "clause_type_distribution": {}
             }
         
-        # Calculate statistics
+        # Calculate statistics from one pass over the attribute lookups
         total = len(analyses)
-        avg_confidence = sum(a.confidence_score for a in analyses) / total
-        low_confidence_count = sum(
-            1 for a in analyses if a.confidence_score < self.confidence_threshold
-        )
+        confidences = [a.confidence_score for a in analyses]
+        avg_confidence = sum(confidences) / total
+        threshold = self.confidence_threshold
+        low_confidence_count = sum(c < threshold for c in confidences)
         
-        # Count clause types
-        type_distribution = {}
-        for analysis in analyses:
-            clause_type = analysis.clause_type
-            type_distribution[clause_type] = type_distribution.get(clause_type, 0) + 1
+        # Count clause types (Counter keeps first-seen order)
+        type_distribution = dict(Counter(a.clause_type for a in analyses))
         
         summary = {
             "total_clauses": total,
@@ -1,7 +1,13 @@
 """PDF text extraction module for contract processing."""
 
+import io
 import logging
-from typing import Optional, Tuple
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
 import PyPDF2
 import pdfplumber
@@ -10,6 +16,57 @@ import pytesseract
 
 logger = logging.getLogger(__name__)
 
+# pdfplumber's layout analysis is pure Python and holds the GIL, so long
+# documents are split into page ranges extracted in separate processes;
+# below PARALLEL_MIN_PAGES the process start-up costs more than it saves
+PDF_MAX_WORKERS = min(8, os.cpu_count() or 1)
+PARALLEL_MIN_PAGES = 16
+
+# Workers are started from a fork server (spawn where that is unavailable):
+# forking the multithreaded Streamlit process could copy a lock held by a
+# torch/tokenizers thread into the child and deadlock it
+PDF_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# is_image_based_pdf reads at most this many leading pages, stopping as
+# soon as MIN_TEXT_CHARS of text have been found
+IMAGE_CHECK_PAGES = 2
+MIN_TEXT_CHARS = 100
+
+
+def _iter_page_texts(pdf, start: int, stop: int) -> Iterator[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Extract the text of a range of pages from an open pdfplumber document.
+    
+    Args:
+        pdf: Open pdfplumber PDF
+        start: Index of the first page
+        stop: Index one past the last page
+        
+    Yields:
+        Tuples of (page_number, page_text, error_message), one per page
+    """
+    for index in range(start, stop):
+        try:
+            yield index + 1, pdf.pages[index].extract_text(), None
+        except Exception as e:
+            yield index + 1, None, str(e)
+
+
+def _extract_page_range(file_path: Path, start: int, stop: int) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Extract a range of pages in a worker process, with its own PDF handle.
+    
+    Args:
+        file_path: Path to PDF file
+        start: Index of the first page
+        stop: Index one past the last page
+        
+    Returns:
+        List of (page_number, page_text, error_message) tuples
+    """
+    with pdfplumber.open(file_path) as pdf:
+        return list(_iter_page_texts(pdf, start, stop))
+
 
 class PDFExtractionError(Exception):
     """Base exception for PDF extraction errors."""
@@ -32,6 +89,27 @@ class PDFExtractor:
     def __init__(self):
         """Initialize PDF extractor."""
         self.logger = logging.getLogger(__name__)
+        
+        # Worker pool reused across documents, started on first parallel extraction
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the shared worker pool, starting it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=PDF_MAX_WORKERS,
+                    mp_context=multiprocessing.get_context(PDF_START_METHOD)
+                )
+            return self._executor
+    
+    def close(self):
+        """Shut down the worker pool; the next parallel extraction starts a new one."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
     
     def extract_text(self, file_path: str) -> str:
         """
@@ -58,7 +136,7 @@ class PDFExtractor:
             text = self._extract_with_pdfplumber(file_path)
             if text and len(text.strip()) > 50:  # Minimum viable text
                 self.logger.info(f"Successfully extracted text using pdfplumber: {len(text)} chars")
-                return self._clean_text(text)
+                return text
         except Exception as e:
             self.logger.warning(f"pdfplumber extraction failed: {e}")
         
@@ -67,7 +145,7 @@ class PDFExtractor:
             text = self._extract_with_pypdf2(file_path)
             if text and len(text.strip()) > 50:
                 self.logger.info(f"Successfully extracted text using PyPDF2: {len(text)} chars")
-                return self._clean_text(text)
+                return text
         except Exception as e:
             self.logger.warning(f"PyPDF2 extraction failed: {e}")
         
@@ -81,31 +159,80 @@ class PDFExtractor:
         """
         Extract text using pdfplumber library.
         
+        Documents of PARALLEL_MIN_PAGES or more pages are extracted across
+        worker processes when more than one CPU is available.
+        
         Args:
             file_path: Path to PDF file
             
         Returns:
-            Extracted text
+            Extracted text, cleaned page by page
         """
-        text_parts = []
+        buf = io.StringIO()
         
         try:
             with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                            self.logger.debug(f"Extracted page {page_num}: {len(page_text)} chars")
-                    except Exception as e:
-                        self.logger.warning(f"Failed to extract page {page_num}: {e}")
+                num_pages = len(pdf.pages)
+                
+                page_texts = None
+                if PDF_MAX_WORKERS > 1 and num_pages >= PARALLEL_MIN_PAGES:
+                    page_texts = self._extract_pages_in_parallel(file_path, num_pages)
+                if page_texts is None:
+                    page_texts = _iter_page_texts(pdf, 0, num_pages)
+                
+                for page_num, page_text, error in page_texts:
+                    if error is not None:
+                        self.logger.warning(f"Failed to extract page {page_num}: {error}")
                         continue
+                    if page_text:
+                        self._clean_page(page_text, buf)
+                        self.logger.debug(f"Extracted page {page_num}: {len(page_text)} chars")
         except Exception as e:
             if "password" in str(e).lower():
                 raise PasswordProtectedError("PDF is password protected")
             raise PDFExtractionError(f"pdfplumber error: {e}")
         
-        return "\n\n".join(text_parts)
+        return buf.getvalue()
+    
+    def _extract_pages_in_parallel(
+        self,
+        file_path: Path,
+        num_pages: int
+    ) -> Optional[Iterator[Tuple[int, Optional[str], Optional[str]]]]:
+        """
+        Extract pages with pdfplumber across worker processes.
+        
+        Pages are split into one contiguous range per worker so each
+        process opens the file once; results come back in page order. The
+        worker pool outlives the call and is reused for later documents.
+        
+        Args:
+            file_path: Path to PDF file
+            num_pages: Number of pages in the PDF
+            
+        Returns:
+            Iterator of (page_number, page_text, error_message) tuples, or
+            None if worker processes could not be used
+        """
+        workers = min(PDF_MAX_WORKERS, num_pages)
+        step = -(-num_pages // workers)
+        starts = range(0, num_pages, step)
+        
+        try:
+            ranges = list(self._get_executor().map(
+                _extract_page_range,
+                [file_path] * len(starts),
+                starts,
+                [min(start + step, num_pages) for start in starts]
+            ))
+        except Exception as e:
+            self.logger.warning(f"Parallel page extraction unavailable, extracting serially: {e}")
+            # Discard a possibly broken pool; the next document starts a fresh one
+            self.close()
+            return None
+        
+        self.logger.debug(f"Extracted {num_pages} pages across {workers} processes")
+        return chain.from_iterable(ranges)
     
     def _extract_with_pypdf2(self, file_path: Path) -> str:
         """
@@ -115,9 +242,9 @@ class PDFExtractor:
             file_path: Path to PDF file
             
         Returns:
-            Extracted text
+            Extracted text, cleaned page by page
         """
-        text_parts = []
+        buf = io.StringIO()
         
         try:
             with open(file_path, 'rb') as file:
@@ -135,7 +262,7 @@ class PDFExtractor:
                         page = pdf_reader.pages[page_num]
                         page_text = page.extract_text()
                         if page_text:
-                            text_parts.append(page_text)
+                            self._clean_page(page_text, buf)
                             self.logger.debug(f"Extracted page {page_num + 1}: {len(page_text)} chars")
                     except Exception as e:
                         self.logger.warning(f"Failed to extract page {page_num + 1}: {e}")
@@ -148,7 +275,7 @@ class PDFExtractor:
                 raise CorruptedFileError(f"PDF file appears corrupted: {e}")
             raise PDFExtractionError(f"PyPDF2 error: {e}")
         
-        return "\n\n".join(text_parts)
+        return buf.getvalue()
     
     def _clean_text(self, text: str) -> str:
         """
@@ -163,42 +290,68 @@ class PDFExtractor:
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            # Strip whitespace
-            line = line.strip()
-            # Skip empty lines
-            if line:
-                # Normalize multiple spaces to single space
-                line = ' '.join(line.split())
-                cleaned_lines.append(line)
+        buf = io.StringIO()
+        self._clean_page(text, buf)
+        return buf.getvalue()
+    
+    def _clean_page(self, page_text: str, buf: io.StringIO):
+        """
+        Clean one page of extracted text and append it to a buffer.
         
-        # Join with single newline
-        cleaned_text = '\n'.join(cleaned_lines)
+        Lines are stripped, internal whitespace is collapsed, empty lines
+        are dropped and common PDF artifacts are removed. Lines from
+        successive pages are separated by a single newline, so the buffer
+        holds the same text as cleaning the joined pages at the end.
         
+        Args:
+            page_text: Raw text of one page
+            buf: Buffer collecting the cleaned document text
+        """
         # Remove common PDF artifacts
-        cleaned_text = cleaned_text.replace('\x00', '')  # Null bytes
-        cleaned_text = cleaned_text.replace('\ufffd', '')  # Replacement character
+        page_text = page_text.replace('\x00', '')  # Null bytes
+        page_text = page_text.replace('\ufffd', '')  # Replacement character
         
-        return cleaned_text
+        for line in page_text.split('\n'):
+            # Normalize multiple spaces to single space, skipping empty lines
+            line = ' '.join(line.split())
+            if not line:
+                continue
+            
+            if buf.tell():
+                buf.write('\n')
+            buf.write(line)
     
     def is_image_based_pdf(self, file_path: str) -> bool:
         """
         Check if PDF is image-based (scanned) rather than text-based.
         
+        Only the first IMAGE_CHECK_PAGES pages are sampled, so the check
+        costs the same for a 2-page and a 200-page document. If pdfplumber
+        cannot read the file, full extraction (with its PyPDF2 fallback)
+        decides instead.
+        
         Args:
             file_path: Path to PDF file
             
         Returns:
             True if PDF appears to be image-based
         """
+        try:
+            with pdfplumber.open(file_path) as pdf:
+                text_chars = 0
+                for page in pdf.pages[:IMAGE_CHECK_PAGES]:
+                    text_chars += len(' '.join((page.extract_text() or '').split()))
+                    if text_chars >= MIN_TEXT_CHARS:
+                        return False
+                # If we get very little text, it's likely image-based
+                return True
+        except Exception as e:
+            self.logger.debug(f"Sampling pages failed, extracting full text: {e}")
+        
         try:
             text = self.extract_text(file_path)
             # If we get very little text, it's likely image-based
-            return len(text.strip()) < 100
+            return len(text.strip()) < MIN_TEXT_CHARS
         except PDFExtractionError:
             # If extraction fails, assume it's image-based
             return True
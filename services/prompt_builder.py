@@ -2,7 +2,9 @@
 Prompt Builder service for creating LLaMA prompts.
 Provides templates for compliance analysis, clause generation, and modification suggestions.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import numpy as np
 
 from models.clause_analysis import ClauseAnalysis
 from models.regulatory_requirement import RegulatoryRequirement, ClauseComplianceResult
@@ -10,23 +12,260 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# A prompt as (module_id, text) pairs; module_id is None for per-call content
+PromptModules = List[Tuple[Optional[str], str]]
+
 
 class PromptBuilder:
     """
     Build structured prompts for LLaMA-based legal reasoning.
     Provides templates for different types of legal analysis tasks.
+    
+    Every prompt starts with a static prefix (persona, task instructions and
+    response format) that depends only on the prompt type and framework,
+    followed by PROMPT_SEPARATOR, the per-call content and the answer cue.
+    Repeated calls therefore share an identical leading byte sequence that
+    prompt/KV caches can reuse.
     """
     
+    PROMPT_SEPARATOR = "\n---\n"
+    
+    # Persona line per prompt type; {framework} is the only parameter
+    PERSONAS = {
+        'recommendation': "You are a legal compliance expert specializing in {framework} regulations.",
+        'generation': "You are a legal drafting expert specializing in {framework} compliance.",
+        'modification': "You are a legal editor specializing in {framework} compliance.",
+        'compliance_analysis': "You are a legal compliance analyst specializing in {framework} regulations.",
+        'gap_analysis': "You are a legal compliance consultant specializing in {framework}.",
+        'batch_recommendation': "You are a legal compliance consultant providing recommendations for {framework} compliance.",
+    }
+    
+    # Task instructions and response format per prompt type
+    TASKS = {
+        'recommendation': """TASK:
+Provide specific, actionable recommendations to make the contract clause below compliant with the regulatory requirement below.
+
+Your response should include:
+1. Priority level (HIGH/MEDIUM/LOW) based on legal risk
+2. Specific action required (ADD/MODIFY/CLARIFY)
+3. Detailed recommendation explaining what needs to change
+4. Rationale referencing the specific regulatory requirement""",
+        'generation': """TASK:
+Draft a complete, legally sound contract clause that satisfies the regulatory requirement below.
+
+Requirements for the clause:
+1. Include ALL mandatory elements listed below
+2. Use clear, professional legal language
+3. Be specific and unambiguous
+4. Match the style of existing clauses if provided
+5. Be comprehensive but concise""",
+        'modification': """TASK:
+Suggest specific modifications to the current clause below to make it compliant with the regulatory requirement below.
+
+Your response should:
+1. Preserve the original structure and intent where possible
+2. Add missing mandatory elements
+3. Clarify ambiguous language
+4. Highlight what changed and why
+
+Provide the modified clause text followed by a brief explanation of changes.""",
+        'compliance_analysis': """TASK:
+Analyze the contract clause below for compliance with the {framework} requirements listed below.
+
+Your analysis should include:
+1. Compliance status (COMPLIANT/PARTIAL/NON-COMPLIANT)
+2. Which requirements are satisfied
+3. Which requirements are missing or incomplete
+4. Specific issues or gaps identified
+5. Risk level (HIGH/MEDIUM/LOW)""",
+        'gap_analysis': """TASK:
+Provide a gap analysis and prioritized recommendations for addressing the missing requirements below.
+
+Your response should include:
+1. Risk assessment for each missing requirement
+2. Priority order for addressing gaps (HIGH/MEDIUM/LOW)
+3. Brief explanation of why each requirement is important
+4. Suggested approach for remediation""",
+        'batch_recommendation': """TASK:
+Provide a prioritized action plan to achieve full {framework} compliance.
+
+Your response should include:
+1. Top 3-5 priority actions
+2. For each action: what needs to be done and why
+3. Estimated risk reduction for each action
+4. Suggested order of implementation""",
+    }
+    
+    # Cue the model answers after, closing each prompt
+    ANSWER_CUES = {
+        'recommendation': "RECOMMENDATION:",
+        'generation': "GENERATED CLAUSE:",
+        'modification': "MODIFIED CLAUSE:",
+        'compliance_analysis': "ANALYSIS:",
+        'gap_analysis': "GAP ANALYSIS:",
+        'batch_recommendation': "ACTION PLAN:",
+    }
+    
     def __init__(self):
         """Initialize PromptBuilder."""
+        # Registry of static prompt modules by stable ID: answer cues and
+        # framework-independent task text up front, persona and
+        # framework-specific task modules as each framework is first used
+        self.modules: Dict[str, str] = {}
+        for method_name, cue in self.ANSWER_CUES.items():
+            self.modules[f"cue_{method_name}"] = f"\n\n{cue}"
+        for method_name, task in self.TASKS.items():
+            if '{framework}' not in task:
+                self.modules[f"task_{method_name}"] = f"{task}\n{self.PROMPT_SEPARATOR}"
+        
+        self._prefix_modules_cache: Dict[Tuple[str, str], PromptModules] = {}
+        self._prefix_cache: Dict[Tuple[str, str], str] = {}
+        
+        # Regulatory context blocks by requirement_id
+        self._ctx_cache: Dict[str, str] = {}
         logger.info("PromptBuilder initialized")
     
+    @staticmethod
+    def render(modules: PromptModules) -> str:
+        """
+        Concatenate prompt modules into the prompt string.
+        
+        Args:
+            modules: (module_id, text) pairs as returned with as_modules=True
+            
+        Returns:
+            Complete prompt
+        """
+        return "".join(text for _, text in modules)
+    
+    def _prefix_modules(self, method_name: str, framework: str) -> PromptModules:
+        """
+        Get the persona and task modules opening a prompt, registering them.
+        
+        Args:
+            method_name: Prompt type (see PERSONAS)
+            framework: Regulatory framework
+            
+        Returns:
+            [(persona_id, persona_text), (task_id, task_text)]
+            
+        Raises:
+            KeyError: If method_name is not a known prompt type
+        """
+        key = (method_name, framework)
+        modules = self._prefix_modules_cache.get(key)
+        if modules is None:
+            persona_id = f"persona_{method_name}_{framework}"
+            self.modules[persona_id] = f"{self.PERSONAS[method_name].format(framework=framework)}\n\n"
+            
+            task_id = f"task_{method_name}"
+            if task_id not in self.modules:
+                task_id = f"task_{method_name}_{framework}"
+                task = self.TASKS[method_name].format(framework=framework)
+                self.modules[task_id] = f"{task}\n{self.PROMPT_SEPARATOR}"
+            
+            modules = [(persona_id, self.modules[persona_id]), (task_id, self.modules[task_id])]
+            self._prefix_modules_cache[key] = modules
+        return modules
+    
+    def get_cacheable_prefix(self, method_name: str, framework: str) -> str:
+        """
+        Get the static prefix shared by every prompt of one type and framework.
+        
+        The returned string is byte-identical across calls and is exactly
+        the start of every prompt built for (method_name, framework), so it
+        can be marked for provider prompt caching.
+        
+        Args:
+            method_name: Prompt type, e.g. 'recommendation' for
+                         build_recommendation_prompt (see PERSONAS)
+            framework: Regulatory framework (GDPR, HIPAA, etc.)
+            
+        Returns:
+            Persona, task instructions and PROMPT_SEPARATOR
+            
+        Raises:
+            KeyError: If method_name is not a known prompt type
+        """
+        key = (method_name, framework)
+        prefix = self._prefix_cache.get(key)
+        if prefix is None:
+            prefix = self.render(self._prefix_modules(method_name, framework))
+            self._prefix_cache[key] = prefix
+        return prefix
+    
+    def _assemble(
+        self,
+        method_name: str,
+        framework: str,
+        dynamic: str,
+        as_modules: bool = False
+    ) -> Union[str, PromptModules]:
+        """
+        Join the static prefix, per-call content and answer cue.
+        
+        Args:
+            method_name: Prompt type (see PERSONAS)
+            framework: Regulatory framework
+            dynamic: Per-call content
+            as_modules: Return (module_id, text) pairs instead of a string;
+                        the per-call content has module_id None
+            
+        Returns:
+            Complete prompt, or its modules
+        """
+        if as_modules:
+            cue_id = f"cue_{method_name}"
+            return [*self._prefix_modules(method_name, framework), (None, dynamic), (cue_id, self.modules[cue_id])]
+        
+        return f"{self.get_cacheable_prefix(method_name, framework)}{dynamic}{self.modules[f'cue_{method_name}']}"
+    
+    @staticmethod
+    def _requirement_header(
+        requirement: RegulatoryRequirement,
+        elements_heading: str = "Mandatory Elements"
+    ) -> str:
+        """
+        Format the REGULATORY REQUIREMENT block for one requirement.
+        
+        Args:
+            requirement: Requirement to describe
+            elements_heading: Heading above the mandatory elements list
+            
+        Returns:
+            Requirement block, without a trailing newline
+        """
+        return f"""REGULATORY REQUIREMENT:
+Reference: {requirement.article_reference}
+Description: {requirement.description}
+{elements_heading}:
+{requirement.formatted_mandatory_elements}"""
+    
+    @staticmethod
+    def _requirements_block(framework: str, requirements: List[RegulatoryRequirement]) -> str:
+        """
+        Format the RELEVANT {framework} REQUIREMENTS block for a clause analysis.
+        
+        Args:
+            framework: Regulatory framework
+            requirements: Requirements to list
+            
+        Returns:
+            Requirements block, without a trailing newline
+        """
+        requirements_text = "\n\n".join([
+            f"{req.article_reference}:\n{req.description}\nMandatory: {req.mandatory}"
+            for req in requirements
+        ])
+        return f"RELEVANT {framework} REQUIREMENTS:\n{requirements_text}"
+    
     def build_recommendation_prompt(
         self,
         clause: ClauseAnalysis,
         requirement: RegulatoryRequirement,
-        issues: List[str]
-    ) -> str:
+        issues: List[str],
+        as_modules: bool = False
+    ) -> Union[str, PromptModules]:
         """
         Build prompt for generating recommendations to fix compliance issues.
         
@@ -34,45 +273,30 @@ class PromptBuilder:
             clause: Analyzed clause with issues
             requirement: Regulatory requirement not met
             issues: List of specific issues identified
+            as_modules: Return (module_id, text) pairs (see render)
             
         Returns:
-            Formatted prompt for recommendation generation
+            Formatted prompt for recommendation generation (or its modules)
         """
         issues_text = "\n".join([f"- {issue}" for issue in issues])
         
-        prompt = f"""You are a legal compliance expert specializing in {requirement.framework} regulations.
-
-REGULATORY REQUIREMENT:
-Reference: {requirement.article_reference}
-Description: {requirement.description}
-Mandatory Elements:
-{self._format_mandatory_elements(requirement.mandatory_elements)}
+        dynamic = f"""{self._requirement_header(requirement)}
 
 CURRENT CONTRACT CLAUSE:
 {clause.clause_text}
 
 IDENTIFIED ISSUES:
-{issues_text}
-
-TASK:
-Provide specific, actionable recommendations to make this clause compliant with {requirement.article_reference}.
-
-Your response should include:
-1. Priority level (HIGH/MEDIUM/LOW) based on legal risk
-2. Specific action required (ADD/MODIFY/CLARIFY)
-3. Detailed recommendation explaining what needs to change
-4. Rationale referencing the specific regulatory requirement
-
-RECOMMENDATION:"""
+{issues_text}"""
         
-        return prompt
+        return self._assemble('recommendation', requirement.framework, dynamic, as_modules)
     
     def build_generation_prompt(
         self,
         requirement: RegulatoryRequirement,
         contract_context: str,
-        existing_clauses: Optional[List[str]] = None
-    ) -> str:
+        existing_clauses: Optional[List[str]] = None,
+        as_modules: bool = False
+    ) -> Union[str, PromptModules]:
         """
         Build prompt for generating compliant clause text from scratch.
         
@@ -80,9 +304,10 @@ RECOMMENDATION:"""
             requirement: Regulatory requirement to address
             contract_context: Context about the contract (type, parties, etc.)
             existing_clauses: List of existing clause texts for context
+            as_modules: Return (module_id, text) pairs (see render)
             
         Returns:
-            Formatted prompt for clause generation
+            Formatted prompt for clause generation (or its modules)
         """
         context_section = f"\nCONTRACT CONTEXT:\n{contract_context}\n" if contract_context else ""
         
@@ -91,34 +316,18 @@ RECOMMENDATION:"""
             existing_text = "\n\n".join(existing_clauses[:3])  # Limit to 3 for context
             existing_section = f"\nEXISTING CLAUSES (for style reference):\n{existing_text}\n"
         
-        prompt = f"""You are a legal drafting expert specializing in {requirement.framework} compliance.
-
-REGULATORY REQUIREMENT:
-Reference: {requirement.article_reference}
-Description: {requirement.description}
-Mandatory Elements Required:
-{self._format_mandatory_elements(requirement.mandatory_elements)}
-{context_section}{existing_section}
-TASK:
-Draft a complete, legally sound contract clause that satisfies {requirement.article_reference}.
-
-Requirements for the clause:
-1. Include ALL mandatory elements listed above
-2. Use clear, professional legal language
-3. Be specific and unambiguous
-4. Match the style of existing clauses if provided
-5. Be comprehensive but concise
-
-GENERATED CLAUSE:"""
+        dynamic = f"""{self._requirement_header(requirement, "Mandatory Elements Required")}
+{context_section}{existing_section}"""
         
-        return prompt
+        return self._assemble('generation', requirement.framework, dynamic.rstrip("\n"), as_modules)
     
     def build_modification_prompt(
         self,
         clause: ClauseAnalysis,
         requirement: RegulatoryRequirement,
-        issues: List[str]
-    ) -> str:
+        issues: List[str],
+        as_modules: bool = False
+    ) -> Union[str, PromptModules]:
         """
         Build prompt for suggesting specific modifications to an existing clause.
         
@@ -126,47 +335,30 @@ GENERATED CLAUSE:"""
             clause: Current clause that needs modification
             requirement: Regulatory requirement to satisfy
             issues: Specific issues to address
+            as_modules: Return (module_id, text) pairs (see render)
             
         Returns:
-            Formatted prompt for modification suggestions
+            Formatted prompt for modification suggestions (or its modules)
         """
         issues_text = "\n".join([f"- {issue}" for issue in issues])
         
-        prompt = f"""You are a legal editor specializing in {requirement.framework} compliance.
-
-REGULATORY REQUIREMENT:
-Reference: {requirement.article_reference}
-Description: {requirement.description}
-Mandatory Elements:
-{self._format_mandatory_elements(requirement.mandatory_elements)}
+        dynamic = f"""{self._requirement_header(requirement)}
 
 CURRENT CLAUSE TEXT:
 {clause.clause_text}
 
 ISSUES TO ADDRESS:
-{issues_text}
-
-TASK:
-Suggest specific modifications to the current clause to make it compliant with {requirement.article_reference}.
-
-Your response should:
-1. Preserve the original structure and intent where possible
-2. Add missing mandatory elements
-3. Clarify ambiguous language
-4. Highlight what changed and why
-
-Provide the modified clause text followed by a brief explanation of changes.
-
-MODIFIED CLAUSE:"""
+{issues_text}"""
         
-        return prompt
+        return self._assemble('modification', requirement.framework, dynamic, as_modules)
     
     def build_compliance_analysis_prompt(
         self,
         clause_text: str,
         framework: str,
-        requirements: List[RegulatoryRequirement]
-    ) -> str:
+        requirements: List[RegulatoryRequirement],
+        as_modules: bool = False
+    ) -> Union[str, PromptModules]:
         """
         Build prompt for comprehensive compliance analysis of a clause.
         
@@ -174,43 +366,25 @@ MODIFIED CLAUSE:"""
             clause_text: Text of clause to analyze
             framework: Regulatory framework (GDPR, HIPAA, etc.)
             requirements: List of relevant requirements to check against
+            as_modules: Return (module_id, text) pairs (see render)
             
         Returns:
-            Formatted prompt for compliance analysis
+            Formatted prompt for compliance analysis (or its modules)
         """
-        requirements_text = "\n\n".join([
-            f"{req.article_reference}:\n{req.description}\nMandatory: {req.mandatory}"
-            for req in requirements
-        ])
-        
-        prompt = f"""You are a legal compliance analyst specializing in {framework} regulations.
-
-RELEVANT {framework} REQUIREMENTS:
-{requirements_text}
+        dynamic = f"""{self._requirements_block(framework, requirements)}
 
 CONTRACT CLAUSE TO ANALYZE:
-{clause_text}
-
-TASK:
-Analyze this clause for compliance with the {framework} requirements listed above.
-
-Your analysis should include:
-1. Compliance status (COMPLIANT/PARTIAL/NON-COMPLIANT)
-2. Which requirements are satisfied
-3. Which requirements are missing or incomplete
-4. Specific issues or gaps identified
-5. Risk level (HIGH/MEDIUM/LOW)
-
-ANALYSIS:"""
+{clause_text}"""
         
-        return prompt
+        return self._assemble('compliance_analysis', framework, dynamic, as_modules)
     
     def build_gap_analysis_prompt(
         self,
         framework: str,
         found_clauses: List[ClauseAnalysis],
-        missing_requirements: List[RegulatoryRequirement]
-    ) -> str:
+        missing_requirements: List[RegulatoryRequirement],
+        as_modules: bool = False
+    ) -> Union[str, PromptModules]:
         """
         Build prompt for analyzing gaps in contract coverage.
         
@@ -218,9 +392,10 @@ ANALYSIS:"""
             framework: Regulatory framework
             found_clauses: Clauses found in the contract
             missing_requirements: Requirements not covered
+            as_modules: Return (module_id, text) pairs (see render)
             
         Returns:
-            Formatted prompt for gap analysis
+            Formatted prompt for gap analysis (or its modules)
         """
         found_types = list(set([c.clause_type for c in found_clauses]))
         found_text = ", ".join(found_types)
@@ -230,33 +405,21 @@ ANALYSIS:"""
             for req in missing_requirements
         ])
         
-        prompt = f"""You are a legal compliance consultant specializing in {framework}.
-
-CONTRACT COVERAGE:
+        dynamic = f"""CONTRACT COVERAGE:
 The contract currently includes clauses for: {found_text}
 
 MISSING REQUIREMENTS:
-{missing_text}
-
-TASK:
-Provide a gap analysis and prioritized recommendations for addressing the missing requirements.
-
-Your response should include:
-1. Risk assessment for each missing requirement
-2. Priority order for addressing gaps (HIGH/MEDIUM/LOW)
-3. Brief explanation of why each requirement is important
-4. Suggested approach for remediation
-
-GAP ANALYSIS:"""
+{missing_text}"""
         
-        return prompt
+        return self._assemble('gap_analysis', framework, dynamic, as_modules)
     
     def build_batch_recommendation_prompt(
         self,
         compliance_results: List[ClauseComplianceResult],
         missing_requirements: List[RegulatoryRequirement],
-        framework: str
-    ) -> str:
+        framework: str,
+        as_modules: bool = False
+    ) -> Union[str, PromptModules]:
         """
         Build prompt for generating recommendations for multiple issues at once.
         
@@ -264,9 +427,10 @@ GAP ANALYSIS:"""
             compliance_results: List of non-compliant clause results
             missing_requirements: List of missing requirements
             framework: Regulatory framework
+            as_modules: Return (module_id, text) pairs (see render)
             
         Returns:
-            Formatted prompt for batch recommendations
+            Formatted prompt for batch recommendations (or its modules)
         """
         # Summarize non-compliant clauses
         non_compliant_summary = []
@@ -285,26 +449,126 @@ GAP ANALYSIS:"""
             for req in missing_requirements[:5]  # Limit to top 5
         ])
         
-        prompt = f"""You are a legal compliance consultant providing recommendations for {framework} compliance.
-
-NON-COMPLIANT CLAUSES:
+        dynamic = f"""NON-COMPLIANT CLAUSES:
 {non_compliant_text}
 
 MISSING REQUIREMENTS:
-{missing_text}
-
-TASK:
-Provide a prioritized action plan to achieve full {framework} compliance.
+{missing_text}"""
+        
+        return self._assemble('batch_recommendation', framework, dynamic, as_modules)
+    
+    def build_recommendation_prompts(
+        self,
+        triples: List[Tuple[ClauseAnalysis, RegulatoryRequirement, List[str]]]
+    ) -> List[str]:
+        """
+        Build recommendation prompts for many (clause, requirement, issues) triples.
+        
+        Produces the same prompts as calling build_recommendation_prompt for
+        each triple, but the static prefix and requirement block are built
+        once per framework and requirement rather than once per triple.
+        
+        Args:
+            triples: (clause, requirement, issues) for each prompt
+            
+        Returns:
+            Formatted prompts in input order
+        """
+        return self._build_clause_prompts(
+            'recommendation', triples, "CURRENT CONTRACT CLAUSE", "IDENTIFIED ISSUES"
+        )
+    
+    def build_modification_prompts(
+        self,
+        triples: List[Tuple[ClauseAnalysis, RegulatoryRequirement, List[str]]]
+    ) -> List[str]:
+        """
+        Build modification prompts for many (clause, requirement, issues) triples.
+        
+        Batched form of build_modification_prompt (see
+        build_recommendation_prompts).
+        
+        Args:
+            triples: (clause, requirement, issues) for each prompt
+            
+        Returns:
+            Formatted prompts in input order
+        """
+        return self._build_clause_prompts(
+            'modification', triples, "CURRENT CLAUSE TEXT", "ISSUES TO ADDRESS"
+        )
+    
+    def _build_clause_prompts(
+        self,
+        method_name: str,
+        triples: List[Tuple[ClauseAnalysis, RegulatoryRequirement, List[str]]],
+        clause_heading: str,
+        issues_heading: str
+    ) -> List[str]:
+        """
+        Build clause/requirement/issues prompts sharing per-requirement blocks.
+        
+        Args:
+            method_name: 'recommendation' or 'modification'
+            triples: (clause, requirement, issues) for each prompt
+            clause_heading: Heading above the clause text
+            issues_heading: Heading above the issue list
+            
+        Returns:
+            Formatted prompts in input order
+        """
+        cue = self.modules[f"cue_{method_name}"]
+        heads: Dict[str, str] = {}
+        prompts = []
+        
+        for clause, requirement, issues in triples:
+            head = heads.get(requirement.requirement_id)
+            if head is None:
+                head = f"""{self.get_cacheable_prefix(method_name, requirement.framework)}{self._requirement_header(requirement)}
 
-Your response should include:
-1. Top 3-5 priority actions
-2. For each action: what needs to be done and why
-3. Estimated risk reduction for each action
-4. Suggested order of implementation
+{clause_heading}:
+"""
+                heads[requirement.requirement_id] = head
+            
+            issues_text = "\n".join([f"- {issue}" for issue in issues])
+            prompts.append(f"{head}{clause.clause_text}\n\n{issues_heading}:\n{issues_text}{cue}")
+        
+        return prompts
+    
+    def build_compliance_analysis_prompts(
+        self,
+        items: List[Tuple[str, str, List[RegulatoryRequirement]]]
+    ) -> List[str]:
+        """
+        Build compliance analysis prompts for many clauses.
+        
+        Produces the same prompts as calling build_compliance_analysis_prompt
+        for each item; the requirements section is built once per distinct
+        framework and requirement list.
+        
+        Args:
+            items: (clause_text, framework, requirements) for each prompt
+            
+        Returns:
+            Formatted prompts in input order
+        """
+        cue = self.modules['cue_compliance_analysis']
+        heads: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        prompts = []
+        
+        for clause_text, framework, requirements in items:
+            key = (framework, tuple(req.requirement_id for req in requirements))
+            head = heads.get(key)
+            if head is None:
+                head = f"""{self.get_cacheable_prefix('compliance_analysis', framework)}{self._requirements_block(framework, requirements)}
 
-ACTION PLAN:"""
+CONTRACT CLAUSE TO ANALYZE:
+"""
+                heads[key] = head
+            
+            prompts.append(f"{head}{clause_text}{cue}")
         
-        return prompt
+        return prompts
     
     def build_regulatory_context_injection(
         self,
@@ -313,12 +577,19 @@ ACTION PLAN:"""
         """
         Build regulatory context section for injection into prompts.
         
+        The block is built once per requirement_id and reused, since
+        requirements are fixed for the lifetime of the knowledge base.
+        
         Args:
             requirement: Regulatory requirement
             
         Returns:
             Formatted regulatory context text
         """
+        context = self._ctx_cache.get(requirement.requirement_id)
+        if context is not None:
+            return context
+        
         context = f"""REGULATORY CONTEXT:
 Framework: {requirement.framework}
 Reference: {requirement.article_reference}
@@ -329,30 +600,16 @@ Risk Level: {requirement.risk_level.value}
         
         if requirement.mandatory_elements:
             context += f"\nMandatory Elements:\n"
-            context += self._format_mandatory_elements(requirement.mandatory_elements)
+            context += requirement.formatted_mandatory_elements
         
         if requirement.keywords:
             context += f"\nKey Terms: {', '.join(requirement.keywords)}\n"
         
+        self._ctx_cache[requirement.requirement_id] = context
         return context
     
     # Helper methods
     
-    def _format_mandatory_elements(self, elements: List[str]) -> str:
-        """
-        Format mandatory elements as a bulleted list.
-        
-        Args:
-            elements: List of mandatory elements
-            
-        Returns:
-            Formatted string
-        """
-        if not elements:
-            return "None specified"
-        
-        return "\n".join([f"  • {element}" for element in elements])
-    
     def _truncate_text(self, text: str, max_length: int = 500) -> str:
         """
         Truncate text to maximum length.
@@ -398,9 +655,60 @@ Risk Level: {requirement.risk_level.value}
         Returns:
             Dictionary with prompt statistics
         """
+        words = len(prompt.split())
         return {
             'length': len(prompt),
             'lines': prompt.count('\n') + 1,
-            'words': len(prompt.split()),
-            'estimated_tokens': len(prompt.split()) * 1.3  # Rough estimate
+            'words': words,
+            'estimated_tokens': words * 1.3  # Rough estimate
         }
+    
+    def validate_and_stats(
+        self,
+        prompt: str,
+        max_length: int = 4000
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Validate a prompt and collect its statistics in one call.
+        
+        Args:
+            prompt: Prompt to validate and analyze
+            max_length: Maximum allowed length
+            
+        Returns:
+            Tuple of (is_valid, statistics dictionary)
+        """
+        stats = self.get_prompt_stats(prompt)
+        if stats['length'] > max_length:
+            logger.warning(
+                f"Prompt length ({stats['length']}) exceeds maximum ({max_length})"
+            )
+            return False, stats
+        
+        return True, stats
+    
+    def validate_prompts_batch(
+        self,
+        prompts: List[str],
+        max_length: int = 4000
+    ) -> np.ndarray:
+        """
+        Validate many prompts at once before a batched generation call.
+        
+        Args:
+            prompts: Prompts to validate
+            max_length: Maximum allowed length
+            
+        Returns:
+            Boolean array, True where the prompt is within max_length
+        """
+        lengths = np.fromiter(map(len, prompts), dtype=np.int64, count=len(prompts))
+        valid = lengths <= max_length
+        
+        if not valid.all():
+            logger.warning(
+                f"{int((~valid).sum())} of {len(prompts)} prompts exceed "
+                f"maximum length ({max_length}); longest is {int(lengths.max())}"
+            )
+        
+        return valid
@@ -107,7 +107,11 @@ def test_highlighted_html_generation():
     assert 'data-clause-type="Data Processing"' in html
     assert 'tooltip-content' in html
     assert 'Click to view details' in html or 'Click for details' in html
-    
+
+    # Streaming fragments must reproduce the same document
+    fragments = viewer._iter_html_fragments(processed_doc, clause_risk_map, clause_details_map)
+    assert ''.join(fragments) == html
+
     print("✅ Highlighted HTML generated successfully with click handlers")
     print(f"   - HTML length: {len(html)} characters")
     print(f"   - Contains clickable clauses: Yes")
@@ -0,0 +1,486 @@
+"""
+Test script for EmbeddingGenerator similarity and caching behaviour.
+Uses a deterministic stub model so no Sentence Transformer download is needed.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import tempfile
+import zlib
+
+import numpy as np
+
+from services.embedding_generator import EmbeddingGenerator
+
+
+class _StubModel:
+    """Deterministic stand-in for SentenceTransformer."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        batch = [sentences] if single else list(sentences)
+        self.encoded.extend(batch)
+        vectors = np.stack([
+            np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(self.dim).astype(np.float32)
+            for text in batch
+        ])
+        if kwargs.get("normalize_embeddings"):
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+
+class _StubEmbeddingGenerator(EmbeddingGenerator):
+    """EmbeddingGenerator wired to the stub model."""
+
+    def _load_model(self, half_precision=True):
+        return _StubModel()
+
+
+class _FailingModel(_StubModel):
+    """Stub model whose encode always fails."""
+
+    def encode(self, sentences, **kwargs):
+        raise RuntimeError("encoder unavailable")
+
+
+def test_find_most_similar_matches_pairwise():
+    """Vectorized search must agree with per-pair compute_similarity."""
+    print("\nTesting find_most_similar against compute_similarity...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(384).astype(np.float32)
+    candidates = [rng.standard_normal(384).astype(np.float32) for _ in range(50)]
+    candidates[7] = np.zeros(384, dtype=np.float32)
+
+    results = generator.find_most_similar(query, candidates, top_k=5)
+
+    expected = sorted(
+        ((idx, generator.compute_similarity(query, cand, normalized_output=True))
+         for idx, cand in enumerate(candidates)),
+        key=lambda x: x[1],
+        reverse=True
+    )[:5]
+
+    assert [idx for idx, _ in results] == [idx for idx, _ in expected]
+    for (_, got), (_, want) in zip(results, expected):
+        assert abs(got - want) < 1e-5
+
+    assert generator.find_most_similar(query, [], top_k=5) == []
+
+    # Zero-norm candidates rank last with a score of 0.0
+    ranked = generator.find_most_similar(query, candidates, top_k=len(candidates))
+    assert len(ranked) == len(candidates)
+    assert ranked[-1] == (7, 0.0)
+
+    # A cached candidate set gives the same ranking
+    generator.set_candidates(np.stack(candidates))
+    assert generator.find_most_similar(query, top_k=len(candidates)) == ranked
+    assert generator.find_most_similar(np.zeros(384, dtype=np.float32), top_k=2) == [(0, 0.0), (1, 0.0)]
+
+    print("✅ find_most_similar matches pairwise similarity")
+
+
+def test_cache_stores_half_precision():
+    """Cached vectors are kept at half precision but returned as float32."""
+    print("\nTesting embedding cache precision...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    text = "The processor shall process personal data only on documented instructions."
+
+    first = generator.generate_embedding(text)
+    second = generator.generate_embedding(text)
+    batch = generator.generate_embeddings_batch([text])
+
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.array_equal(first, batch[0])
+    assert generator._embedding_cache[generator._cache_key(text)].dtype == np.float16
+    assert generator.model.encoded.count(text) == 1
+
+    print("✅ Cache stores float16 and returns float32")
+
+
+def test_cache_lru_eviction():
+    """Cache stays bounded and evicts the least recently used entry."""
+    print("\nTesting LRU cache eviction...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False, cache_max=2)
+
+    generator.generate_embedding("clause a")
+    generator.generate_embedding("clause b")
+    generator.generate_embedding("clause a")  # a is now most recent
+    generator.generate_embedding("clause c")  # evicts b
+
+    assert generator.get_cache_size() == 2
+    assert "clause a" in generator._embedding_cache
+    assert "clause b" not in generator._embedding_cache
+
+    stats = generator.cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 3
+    assert stats['evictions'] == 1
+
+    print("✅ LRU cache evicts least recently used entries")
+
+
+def test_cache_shared_across_threads():
+    """Concurrent lookups and evictions on one generator do not race."""
+    print("\nTesting LRU cache under concurrent use...")
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    generator = _StubEmbeddingGenerator(use_onnx=False, cache_max=4)
+    texts = [f"clause {i}" for i in range(12)]
+
+    def work(seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(200):
+            picked = [texts[i] for i in rng.integers(len(texts), size=3)]
+            assert generator.generate_embedding(picked[0]).any()
+            # A race in the batch path would surface as the zero-vector fallback
+            assert generator.generate_embeddings_batch(picked, return_matrix=True).all(axis=1).all()
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(8)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert generator.get_cache_size() <= 4
+    for text in texts:
+        expected = generator._encode(text).astype(np.float16).astype(np.float32)
+        assert np.array_equal(generator.generate_embedding(text), expected)
+
+    print("✅ LRU cache consistent across threads")
+
+
+def test_long_texts_cached_by_digest():
+    """Long texts are keyed by a fixed-size digest, short texts by value."""
+    print("\nTesting hashed cache keys...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    long_text = "The business associate shall report any security incident. " * 5
+    short_text = "Governing law"
+
+    generator.generate_embeddings_batch([long_text, short_text])
+
+    assert short_text in generator._embedding_cache
+    assert long_text not in generator._embedding_cache
+    assert len(generator._cache_key(long_text)) == 16
+    assert generator._cache_key(long_text) in generator._embedding_cache
+
+    generator.generate_embedding(long_text)
+    assert generator.model.encoded.count(long_text) == 1
+
+    print("✅ Long texts cached under digest keys")
+
+
+def test_batch_encodes_duplicates_once():
+    """Repeated texts in one batch are encoded once and scattered back."""
+    print("\nTesting batch deduplication...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    texts = ["clause a", "clause b", "clause a", "clause c", "clause b"]
+
+    embeddings = generator.generate_embeddings_batch(texts)
+
+    assert len(embeddings) == len(texts)
+    assert generator.model.encoded == ["clause a", "clause b", "clause c"]
+    assert np.array_equal(embeddings[0], embeddings[2])
+    assert np.array_equal(embeddings[1], embeddings[4])
+    assert generator.get_cache_size() == 3
+
+    # A second pass is served entirely from the cache
+    again = generator.generate_embeddings_batch(texts)
+    assert len(generator.model.encoded) == 3
+    assert generator.cache_stats()['hits'] == len(texts)
+    for first, second in zip(embeddings, again):
+        assert np.array_equal(first, second)
+
+    print("✅ Duplicate texts encoded once")
+
+
+def test_generated_embeddings_are_unit_norm():
+    """Generated embeddings are normalized so a dot product is the cosine."""
+    print("\nTesting embedding normalization...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    a = generator.generate_embedding("clause a")
+    b = generator.generate_embeddings_batch(["clause b"])[0]
+
+    assert abs(np.linalg.norm(a) - 1.0) < 1e-3
+    assert abs(np.linalg.norm(b) - 1.0) < 1e-3
+    assert abs(
+        generator.compute_similarity(a, b, unit_norm=True) - generator.compute_similarity(a, b)
+    ) < 1e-3
+
+    print("✅ Embeddings are unit-norm")
+
+
+def test_batch_encodes_in_length_order():
+    """Texts are encoded shortest first but returned in caller order."""
+    print("\nTesting length-sorted batch encoding...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    texts = ["a much longer clause about processing", "short", "medium clause"]
+
+    embeddings = generator.generate_embeddings_batch(texts)
+
+    assert generator.model.encoded == sorted(texts, key=len)
+    for text, embedding in zip(texts, embeddings):
+        assert np.array_equal(embedding, generator.generate_embedding(text))
+
+    print("✅ Batch encoded in length order")
+
+
+def test_batch_return_matrix():
+    """return_matrix gives one contiguous (N, D) array in caller order."""
+    print("\nTesting matrix return from batch generation...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    generator.generate_embedding("clause b")
+    texts = ["clause a", "clause b", "clause a"]
+
+    matrix = generator.generate_embeddings_batch(texts, return_matrix=True)
+    vectors = generator.generate_embeddings_batch(texts)
+
+    assert isinstance(matrix, np.ndarray)
+    assert matrix.shape == (3, 384)
+    assert matrix.dtype == np.float32
+    assert matrix.flags['C_CONTIGUOUS']
+    for row, vector in zip(matrix, vectors):
+        assert np.array_equal(row, vector)
+
+    empty = generator.generate_embeddings_batch([], return_matrix=True)
+    assert empty.shape == (0, 384)
+
+    print("✅ Batch returns a contiguous matrix")
+
+
+def test_disk_cache_survives_restart():
+    """Embeddings written to the disk cache are reused by a new generator."""
+    print("\nTesting persistent disk cache...")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        texts = ["clause a", "The processor shall assist the controller with data subject requests. " * 2]
+
+        first = _StubEmbeddingGenerator(use_onnx=False, disk_cache_dir=cache_dir)
+        original = first.generate_embeddings_batch(texts)
+
+        second = _StubEmbeddingGenerator(use_onnx=False, disk_cache_dir=cache_dir)
+        single = second.generate_embedding(texts[0])
+        matrix = second.generate_embeddings_batch(texts + texts, return_matrix=True)
+
+        assert second.model.encoded == []
+        assert np.array_equal(single, original[0])
+        for row, expected in zip(matrix, original + original):
+            assert np.array_equal(row, expected)
+        assert second.cache_stats()['disk_hits'] == 2
+        assert second.cache_stats()['disk_size'] == 2
+
+    print("✅ Disk cache reused across generator instances")
+
+
+def test_disk_cache_scoped_to_model():
+    """A disk cache directory is never read back by another model or dimension."""
+    print("\nTesting disk cache scoping...")
+
+    class _NarrowStubGenerator(EmbeddingGenerator):
+        def _load_model(self, half_precision=True):
+            return _StubModel(dim=128)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = _StubEmbeddingGenerator(use_onnx=False, disk_cache_dir=cache_dir)
+        first.generate_embedding("clause a")
+
+        # Another dimension gets its own index and vector files
+        narrow = _NarrowStubGenerator(use_onnx=False, disk_cache_dir=cache_dir)
+        assert len(narrow._disk_store) == 0
+        assert narrow.generate_embedding("clause a").shape == (128,)
+        assert narrow.model.encoded == ["clause a"]
+
+        # Another model with the same dimension is refused, not served stale rows
+        other = _StubEmbeddingGenerator(model_name="other-model", use_onnx=False, disk_cache_dir=cache_dir)
+        assert other._disk_store is None
+        other.generate_embedding("clause a")
+        assert other.model.encoded == ["clause a"]
+
+        reopened = _StubEmbeddingGenerator(use_onnx=False, disk_cache_dir=cache_dir)
+        assert len(reopened._disk_store) == 1
+
+    print("✅ Disk cache scoped to model, backend and dimension")
+
+
+def test_disk_cache_concurrent_writes_and_failures():
+    """Concurrent writers get distinct rows; a broken store falls back to the model."""
+    print("\nTesting disk cache under concurrent writes...")
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        generator = _StubEmbeddingGenerator(use_onnx=False, disk_cache_dir=cache_dir)
+        texts = [f"clause {i}" for i in range(64)]
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda chunk: generator.generate_embeddings_batch(texts[chunk::8]), range(8)))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        store = generator._disk_store
+        assert len(store) == len(texts)
+        for text in texts:
+            expected = generator._encode(text).astype(np.float16).astype(np.float32)
+            assert np.array_equal(store.get(generator._cache_key(text)), expected)
+
+        # sqlite errors are logged and the model result is still returned
+        store._db.close()
+        generator.clear_cache()
+        embedding = generator.generate_embedding("clause 0")
+        assert np.array_equal(embedding, generator._encode("clause 0").astype(np.float16).astype(np.float32))
+
+    print("✅ Disk cache rows allocated atomically")
+
+
+def test_fallback_vectors_match_model_dimension():
+    """Zero-vector fallbacks use the loaded model's dimension."""
+    print("\nTesting fallback embedding dimension...")
+
+    class _WideFailingGenerator(_StubEmbeddingGenerator):
+        def _load_model(self, half_precision=True):
+            return _FailingModel(768)
+
+    generator = _WideFailingGenerator(use_onnx=False)
+
+    assert generator.generate_embedding("clause a").shape == (768,)
+    assert generator.generate_embeddings_batch(["clause a"])[0].shape == (768,)
+    assert generator.generate_embeddings_batch(["clause a"], return_matrix=True).shape == (1, 768)
+
+    print("✅ Fallback vectors match the model dimension")
+
+
+def test_half_precision_model_output_upcast():
+    """Embeddings from a float16 model come back as float32."""
+    print("\nTesting half precision model output...")
+
+    class _HalfStubModel(_StubModel):
+        def encode(self, sentences, **kwargs):
+            return super().encode(sentences, **kwargs).astype(np.float16)
+
+    class _HalfGenerator(_StubEmbeddingGenerator):
+        def _load_model(self, half_precision=True):
+            return _HalfStubModel()
+
+    generator = _HalfGenerator(use_onnx=False)
+
+    assert generator.generate_embedding("clause a", use_cache=False).dtype == np.float32
+    assert generator.generate_embeddings_batch(["clause b"], return_matrix=True).dtype == np.float32
+
+    print("✅ Half precision output upcast to float32")
+
+
+def test_compute_similarity_scales():
+    """Raw cosine by default, [0, 1] on request, zero vectors score 0.0."""
+    print("\nTesting compute_similarity output scales...")
+
+    generator = _StubEmbeddingGenerator(use_onnx=False)
+    a = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    b = np.array([-1.0, 0.0, 0.0], dtype=np.float32)
+    zero = np.zeros(3, dtype=np.float32)
+
+    assert abs(generator.compute_similarity(a, b) + 1.0) < 1e-6
+    assert abs(generator.compute_similarity(a, b, normalized_output=True)) < 1e-6
+    assert abs(generator.compute_similarity(a, a.astype(np.float64), normalized_output=True) - 1.0) < 1e-6
+    assert generator.compute_similarity(a, zero) == 0.0
+    assert generator.compute_similarity(a.astype(np.float64), zero.astype(np.float64)) == 0.0
+
+    print("✅ compute_similarity scales verified")
+
+
+def test_uncased_keys_ignore_case_and_whitespace():
+    """With an uncased tokenizer, case and spacing variants share a cache entry."""
+    print("\nTesting normalized cache keys...")
+
+    class _UncasedTokenizer:
+        do_lower_case = True
+
+    class _UncasedStubModel(_StubModel):
+        tokenizer = _UncasedTokenizer()
+
+    class _UncasedGenerator(_StubEmbeddingGenerator):
+        def _load_model(self, half_precision=True):
+            return _UncasedStubModel()
+
+    generator = _UncasedGenerator(use_onnx=False)
+    clause = "The Processor shall notify the Controller of any personal data breach without undue delay."
+    variant = "  the processor shall notify\nthe controller of any personal  data breach without undue delay. "
+
+    first = generator.generate_embedding(clause)
+    second = generator.generate_embedding(variant)
+    generator.generate_embeddings_batch(["Governing Law", "governing  law"])
+
+    assert np.array_equal(first, second)
+    assert generator.model.encoded == [clause, "Governing Law"]
+    assert generator._cache_key("Governing\tLaw") == "governing law"
+
+    # Cased tokenizers keep exact-text keys
+    cased = _StubEmbeddingGenerator(use_onnx=False)
+    assert cased._cache_key("Governing  Law") == "Governing  Law"
+
+    print("✅ Case and whitespace variants share cache entries")
+
+
+def run_all_tests():
+    """Run all embedding generator tests."""
+    print("=" * 70)
+    print("EMBEDDING GENERATOR TESTS")
+    print("=" * 70)
+
+    try:
+        test_find_most_similar_matches_pairwise()
+        test_cache_stores_half_precision()
+        test_cache_lru_eviction()
+        test_cache_shared_across_threads()
+        test_long_texts_cached_by_digest()
+        test_batch_encodes_duplicates_once()
+        test_generated_embeddings_are_unit_norm()
+        test_batch_encodes_in_length_order()
+        test_batch_return_matrix()
+        test_disk_cache_survives_restart()
+        test_disk_cache_scoped_to_model()
+        test_disk_cache_concurrent_writes_and_failures()
+        test_fallback_vectors_match_model_dimension()
+        test_half_precision_model_output_upcast()
+        test_compute_similarity_scales()
+        test_uncased_keys_ignore_case_and_whitespace()
+
+        print("\n" + "=" * 70)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -193,6 +193,28 @@ def test_json_export():
         assert 'report' in parsed
         assert 'recommendations' in parsed
         assert 'metadata' in parsed
+        assert parsed['report'] == report.to_dict()
+        assert parsed['recommendations'] == [rec.to_dict() for rec in recommendations]
+        assert json_data.startswith('{\n  "report"')
+        assert 'HIPAA §164.308' in json_data  # non-ASCII kept as-is
+        
+        # Without recommendations or metadata the envelope can be skipped
+        bare = json.loads(export_service.export_to_json(report, include_metadata=False, wrap=False))
+        assert bare == report.to_dict()
+        wrapped = json.loads(export_service.export_to_json(report, recommendations, wrap=False))
+        assert wrapped['report'] == report.to_dict()
+        
+        # The stdlib fallback encodes the same document
+        import services.export_service as export_module
+        orjson_available = export_module.ORJSON_AVAILABLE
+        export_module.ORJSON_AVAILABLE = False
+        try:
+            fallback = json.loads(export_service.export_to_json(report, recommendations))
+            assert fallback['report'] == parsed['report']
+            assert fallback['recommendations'] == parsed['recommendations']
+            assert json.loads(export_service.export_to_json(report, include_metadata=False, wrap=False)) == bare
+        finally:
+            export_module.ORJSON_AVAILABLE = orjson_available
         
         print(f"✓ JSON structure validated")
         print(f"  - Report document ID: {parsed['report']['document_id']}")
@@ -244,6 +266,152 @@ def test_csv_export():
         return False
 
 
+def test_csv_quoting():
+    """Test that CSV sections quote embedded delimiters."""
+    print("\n" + "="*60)
+    print("Testing CSV Quoting")
+    print("="*60)
+    
+    try:
+        import csv
+        import io
+        
+        export_service = ExportService()
+        report = create_sample_report()
+        recommendations = create_sample_recommendations()
+        
+        report.frameworks_checked = ["GDPR, EU", "HIPAA"]
+        report.missing_requirements[0].description = 'Notify the "authority", within 72 hours\nof awareness'
+        recommendations[0].regulatory_reference = "GDPR Article 33, 34"
+        
+        csv_data = export_service.export_to_csv(report, recommendations)
+        rows = list(csv.reader(io.StringIO(csv_data)))
+        
+        assert ['Frameworks Checked', 'GDPR, EU; HIPAA'] in rows
+        assert [
+            'GDPR', 'GDPR Article 33', 'Breach Notification',
+            'Notify the "authority", within 72 hours\nof awareness'
+        ] in rows
+        assert any(row[-1:] == ['GDPR Article 33, 34'] for row in rows)
+        
+        print(f"✓ Embedded commas, quotes and newlines round-trip")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ CSV quoting failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_shared_timestamp():
+    """Test that one timestamp drives every filename and the JSON metadata."""
+    print("\n" + "="*60)
+    print("Testing Shared Export Timestamp")
+    print("="*60)
+    
+    try:
+        import json
+        from datetime import datetime
+        
+        export_service = ExportService()
+        report = create_sample_report()
+        when = datetime(2024, 3, 1, 9, 30, 15)
+        
+        assert export_service.get_json_filename(report, when) == "compliance_report_test_contract_001_20240301_093015.json"
+        assert export_service.get_csv_filename(report, when).endswith("_20240301_093015.csv")
+        assert export_service.get_pdf_filename(report, when).endswith("_20240301_093015.pdf")
+        
+        parsed = json.loads(export_service.export_to_json(report, timestamp=when))
+        assert parsed['metadata']['export_date'] == when.isoformat()
+        
+        print(f"✓ Filenames and metadata share the export timestamp")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Shared timestamp failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_export_all():
+    """Test that concurrent export matches the individual exports."""
+    print("\n" + "="*60)
+    print("Testing Concurrent Export")
+    print("="*60)
+    
+    try:
+        from datetime import datetime
+        
+        export_service = ExportService()
+        report = create_sample_report()
+        recommendations = create_sample_recommendations()
+        when = datetime(2024, 3, 1, 9, 30, 15)
+        
+        exports = export_service.export_all(report, recommendations, timestamp=when)
+        
+        assert exports['json'] == export_service.export_to_json(report, recommendations, timestamp=when)
+        assert exports['csv'] == export_service.export_to_csv(report, recommendations)
+        assert exports['pdf'][:4] == b'%PDF'
+        
+        print(f"✓ JSON, CSV and PDF exported together")
+        
+        import tempfile
+        with tempfile.TemporaryDirectory() as out_dir:
+            paths = export_service.persist_all(exports, out_dir, report, timestamp=when)
+            
+            assert paths['pdf'].name == export_service.get_pdf_filename(report, when)
+            assert paths['pdf'].read_bytes() == exports['pdf']
+            assert paths['csv'].read_bytes() == exports['csv'].encode('utf-8')
+        
+        print(f"✓ Exports persisted under their suggested filenames")
+        
+        return True
+        
+    except ExportError as e:
+        if "reportlab" in str(e).lower():
+            print(f"⚠ Concurrent export skipped: ReportLab not installed")
+            return True
+        print(f"✗ Concurrent export failed: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Concurrent export failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_bulk_previews():
+    """Test that batched previews match per-row truncation."""
+    print("\n" + "="*60)
+    print("Testing Batched Previews")
+    print("="*60)
+    
+    try:
+        from services.export_service import _preview, _previews, ARROW_PREVIEW_MIN_ROWS
+        
+        texts = [
+            "é" * (i % 150) + "clause " * (i % 30)
+            for i in range(ARROW_PREVIEW_MIN_ROWS + 5)
+        ]
+        
+        assert _previews(texts, 100) == [_preview(text, 100) for text in texts]
+        assert _previews(texts[:3], 100) == [_preview(text, 100) for text in texts[:3]]
+        
+        print(f"✓ Batched previews match per-row truncation")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Batched previews failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def test_pdf_export():
     """Test PDF export functionality."""
     print("\n" + "="*60)
@@ -266,6 +434,44 @@ def test_pdf_export():
         assert pdf_data[:4] == b'%PDF', "Invalid PDF header"
         print(f"✓ PDF format validated")
         
+        # Streaming into a sink writes the same document
+        import io
+        from datetime import datetime
+        when = datetime(2024, 3, 1, 9, 30, 15)
+        sink = io.BytesIO()
+        export_service.export_to_pdf_stream(report, sink, recommendations, timestamp=when)
+        assert sink.getvalue()[:4] == b'%PDF'
+        in_memory = export_service.export_to_pdf(report, recommendations, timestamp=when)
+        assert len(sink.getvalue()) == len(in_memory)
+        # A smaller follow-up export must not carry bytes over from the previous one
+        smaller = export_service.export_to_pdf(report, timestamp=when)
+        assert len(smaller) < len(in_memory) and smaller.endswith(b'%%EOF\n')
+        print(f"✓ PDF streamed to sink")
+        
+        # Assessment bands are inclusive at their lower bound
+        from services.export_service import PDFReportGenerator
+        generator = PDFReportGenerator()
+        assert generator._get_assessment_text(90).startswith("Excellent")
+        assert generator._get_assessment_text(89.9).startswith("Good")
+        assert generator._get_assessment_text(60).startswith("Fair")
+        assert generator._get_assessment_text(59.9).startswith("Poor")
+        print(f"✓ Assessment bands validated")
+
+        # Reports built on several threads at once do not share flowables
+        from concurrent.futures import ThreadPoolExecutor
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # interleave threads mid-draw
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                concurrent_pdfs = list(pool.map(
+                    lambda _: PDFReportGenerator().generate_report(report, recommendations, timestamp=when),
+                    range(320)
+                ))
+        finally:
+            sys.setswitchinterval(switch_interval)
+        assert all(len(pdf) == len(in_memory) for pdf in concurrent_pdfs)
+        print(f"✓ Concurrent PDF exports succeeded")
+
         # Optionally save to file for manual inspection
         output_file = "test_compliance_report.pdf"
         with open(output_file, 'wb') as f:
@@ -300,6 +506,10 @@ def main():
     results = {
         'JSON Export': test_json_export(),
         'CSV Export': test_csv_export(),
+        'CSV Quoting': test_csv_quoting(),
+        'Shared Timestamp': test_shared_timestamp(),
+        'Concurrent Export': test_export_all(),
+        'Batched Previews': test_bulk_previews(),
         'PDF Export': test_pdf_export()
     }
     
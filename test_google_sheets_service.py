@@ -6,10 +6,43 @@ from services.google_sheets_service import (
     GoogleSheetsService,
     GoogleSheetsError,
     AuthenticationError,
-    SheetNotFoundError
+    SheetNotFoundError,
+    FIRST_SHEET_RANGE
 )
 
 
+class _FakeRequest:
+    """Stand-in for a googleapiclient HttpRequest."""
+    
+    def __init__(self, response):
+        self._response = response
+    
+    def execute(self):
+        return self._response
+
+
+class _FakeSheetsApi:
+    """Records Sheets API calls and serves fixed cell values."""
+    
+    def __init__(self, values):
+        self.values_data = values
+        self.calls = []
+    
+    def spreadsheets(self):
+        return self
+    
+    def values(self):
+        return self
+    
+    def get(self, spreadsheetId, range=None, **kwargs):
+        if range is None:
+            self.calls.append(("spreadsheets.get", None))
+            return _FakeRequest({'sheets': [{'properties': {'title': 'Sheet1'}}]})
+        self.calls.append(("values.get", range))
+        self.fields = kwargs.get('fields')
+        return _FakeRequest({'values': self.values_data})
+
+
 class TestGoogleSheetsService:
     """Test Google Sheets service functionality."""
     
@@ -72,6 +105,44 @@ class TestGoogleSheetsService:
         with pytest.raises(AuthenticationError):
             service._initialize_service()
     
+    def test_extract_text_default_range_single_request(self):
+        """Test that the first sheet is read without a metadata request."""
+        service = GoogleSheetsService()
+        service._service = _FakeSheetsApi([["Clause 1", "", "Processor obligations"], [], ["Clause 2"]])
+        
+        url = "https://docs.google.com/spreadsheets/d/1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgvE2upms/edit"
+        text = service.extract_text_from_sheet(url)
+        
+        assert text == "Clause 1 Processor obligations\nClause 2"
+        assert service._service.calls == [("values.get", FIRST_SHEET_RANGE)]
+        assert service._service.fields == 'values'
+    
+    def test_extract_text_non_string_cells(self):
+        """Test that rows with non-string cells are still joined."""
+        service = GoogleSheetsService()
+        service._service = _FakeSheetsApi([["Clause", 3, 0, ""], ["Fee", 1.5]])
+        
+        url = "https://docs.google.com/spreadsheets/d/1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgvE2upms/edit"
+        
+        assert service.extract_text_from_sheet(url) == "Clause 3\nFee 1.5"
+    
+    def test_service_reused_across_instances(self, tmp_path, monkeypatch):
+        """Test that the built API client is shared by later instances."""
+        from google.auth.credentials import AnonymousCredentials
+        import services.google_sheets_service as sheets_module
+        
+        credentials_path = tmp_path / "credentials.json"
+        credentials_path.write_text("{}")
+        monkeypatch.setattr(sheets_module, "_load_credentials", lambda path: AnonymousCredentials())
+        
+        first = GoogleSheetsService(credentials_path=str(credentials_path))
+        second = GoogleSheetsService(credentials_path=str(credentials_path))
+        first._initialize_service()
+        second._initialize_service()
+        
+        assert first._service is not None
+        assert first._service is second._service
+    
     def test_extract_text_invalid_url(self):
         """Test extracting text with invalid URL."""
         service = GoogleSheetsService()
@@ -0,0 +1,200 @@
+"""
+Test script for LegalBERTClassifier embeddings and keyword classification.
+Uses a deterministic stub model and tokenizer so no LegalBERT download is needed.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import torch
+
+from services.legal_bert_classifier import LegalBERTClassifier, _lowercase
+
+
+class _StubTokenizer:
+    """Character-level stand-in for a Hugging Face tokenizer."""
+
+    def __init__(self):
+        self.calls = []
+        self.batches = []
+
+    def __call__(self, texts, return_tensors="pt", truncation=True, max_length=512, padding=True):
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        self.calls.append(len(batch))
+        self.batches.append(batch)
+        ids = [[1] + [ord(ch) % 97 + 2 for ch in text][:max_length - 1] for text in batch]
+        width = max(len(row) for row in ids)
+        input_ids = torch.zeros((len(ids), width), dtype=torch.long)
+        attention_mask = torch.zeros((len(ids), width), dtype=torch.long)
+        for row, token_ids in enumerate(ids):
+            input_ids[row, :len(token_ids)] = torch.tensor(token_ids)
+            attention_mask[row, :len(token_ids)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+class _StubOutput:
+    def __init__(self, last_hidden_state):
+        self.last_hidden_state = last_hidden_state
+
+
+class _StubModel(torch.nn.Module):
+    """Embeds tokens and puts the masked sum in the [CLS] position."""
+
+    def __init__(self, hidden_size: int = 768):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embed = torch.nn.Embedding(100, hidden_size)
+        self.forward_calls = 0
+
+    def forward(self, input_ids, attention_mask):
+        self.forward_calls += 1
+        hidden = self.embed(input_ids) * attention_mask.unsqueeze(-1)
+        hidden[:, 0, :] = hidden.sum(dim=1)
+        return _StubOutput(hidden)
+
+
+class _StubClassifier(LegalBERTClassifier):
+    """LegalBERTClassifier wired to the stub model and tokenizer."""
+
+    def _load_model(self, quantize=True):
+        return _StubModel()
+
+    def _load_tokenizer(self):
+        return _StubTokenizer()
+
+
+def test_batch_embeddings_match_single():
+    """Batched embeddings match one-at-a-time embeddings despite padding."""
+    print("\nTesting batched LegalBERT embeddings...")
+
+    classifier = _StubClassifier()
+    texts = [
+        "The processor shall notify the controller of any breach.",
+        "Governing law",
+        "Sub-processors require prior written authorization.",
+    ]
+
+    batch = classifier.get_embeddings_batch(texts, batch_size=2)
+
+    assert batch.shape == (3, 768)
+    assert classifier.tokenizer.calls == [2, 1]
+    # Batches are formed shortest first, so the two shorter texts pad together
+    assert classifier.tokenizer.batches[0] == [texts[1], texts[2]]
+    assert classifier.model.forward_calls == 2
+    for text, row in zip(texts, batch):
+        assert np.allclose(classifier.get_embeddings(text), row, atol=1e-5)
+
+    assert classifier.get_embeddings_batch([]).shape == (0, 768)
+
+    print("✅ Batched embeddings match single embeddings")
+
+
+def test_keyword_scores_match_substring_scan():
+    """Keyword automaton scores match the plain substring scan."""
+    print("\nTesting keyword classification scoring...")
+
+    classifier = _StubClassifier()
+    texts = [
+        "The Processor shall notify the Controller of any Data Breach without undue delay.",
+        "Sub-processor engagement requires prior written authorization; the controller may object.",
+        "Standard contractual clauses govern any transfer to a third country.",
+        "This Agreement is governed by the laws of England.",
+        "",
+    ]
+
+    with_automaton = [classifier._keyword_based_classification(text) for text in texts]
+    classifier._keyword_automaton = None
+    with_scan = [classifier._keyword_based_classification(text) for text in texts]
+
+    assert with_automaton == with_scan
+
+    # Reclassifying a clause reuses its lowercased text
+    hits_before = _lowercase.cache_info().hits
+    classifier._keyword_based_classification(texts[0])
+    assert _lowercase.cache_info().hits == hits_before + 1
+
+    print("✅ Keyword scores match substring scan")
+
+
+def test_predict_batch_matches_predict():
+    """Batch predictions match per-text predictions in input order."""
+    print("\nTesting batched clause prediction...")
+
+    classifier = _StubClassifier()
+    texts = [
+        "The Processor shall notify the Controller of any Data Breach without undue delay.",
+        "This Agreement is governed by the laws of England.",
+        "Standard contractual clauses govern any transfer to a third country.",
+    ]
+
+    assert classifier.predict_batch(texts) == [classifier.predict(text) for text in texts]
+    assert classifier.predict_batch(texts, top_k=1)[0][2] == classifier.predict(texts[0], top_k=1)[2]
+    assert classifier.predict_batch([]) == []
+
+    # Repeated texts are classified once but get independent alternatives
+    scored = []
+    original = classifier._keyword_based_classification
+    classifier._keyword_based_classification = lambda text: scored.append(text) or original(text)
+    repeated = classifier.predict_batch([texts[0], texts[1], texts[0]])
+    assert scored == [texts[0], texts[1]]
+    assert repeated[0] == repeated[2]
+    assert repeated[0][2] is not repeated[2][2]
+    del classifier._keyword_based_classification
+
+    # A failing text falls back to the safe default without failing the batch
+    predictions = classifier.predict_batch([texts[0], None])
+    assert predictions[0] == classifier.predict(texts[0])
+    assert predictions[1] == ("Other", 0.5, [("Other", 0.5)])
+
+    print("✅ Batched predictions match single predictions")
+
+
+def test_embedding_fallback_is_shared_zeros():
+    """A failing forward pass returns read-only zeros without allocating."""
+    print("\nTesting LegalBERT embedding fallback...")
+
+    classifier = _StubClassifier()
+    classifier.model = None  # any forward pass now raises
+
+    batch = classifier.get_embeddings_batch(["clause a", "clause b"])
+    single = classifier.get_embeddings("clause a")
+
+    assert batch.shape == (2, 768)
+    assert single.shape == (768,)
+    assert not batch.any() and not single.any()
+    assert not single.flags.writeable
+    assert np.shares_memory(batch, single)
+
+    print("✅ Fallback embeddings share one zero buffer")
+
+
+def run_all_tests():
+    """Run all LegalBERT classifier tests."""
+    print("=" * 70)
+    print("LEGALBERT CLASSIFIER TESTS")
+    print("=" * 70)
+
+    try:
+        test_batch_embeddings_match_single()
+        test_keyword_scores_match_substring_scan()
+        test_predict_batch_matches_predict()
+        test_embedding_fallback_is_shared_zeros()
+
+        print("\n" + "=" * 70)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
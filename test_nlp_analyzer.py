@@ -2,13 +2,26 @@
 Test script for NLP Analyzer orchestrator.
 """
 import sys
+import tempfile
 from pathlib import Path
 
 # Add App directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+import services.nlp_analyzer as nlp_analyzer_module
 from services.nlp_analyzer import NLPAnalyzer
 from models.clause import Clause
+from test_embedding_generator import _StubEmbeddingGenerator
+from test_legal_bert_classifier import _StubClassifier
+
+
+def _stub_analyzer(**kwargs) -> NLPAnalyzer:
+    """NLPAnalyzer wired to stub models, so no model download is needed."""
+    return NLPAnalyzer(
+        classifier=_StubClassifier(),
+        embedding_generator=_StubEmbeddingGenerator(use_onnx=False),
+        **kwargs
+    )
 
 
 def test_single_clause_analysis():
@@ -247,6 +260,106 @@ def test_error_handling():
     print("✓ Error handling test passed")
 
 
+def test_batch_matches_single_analysis():
+    """Test that batch analysis agrees with analyzing clauses one by one."""
+    print("\n=== Test 7: Batch vs Single Analysis (stub models) ===")
+    
+    analyzer = _stub_analyzer()
+    texts = [
+        "The processor shall process personal data only on documented instructions from the controller.",
+        "The processor shall notify the controller without undue delay after becoming aware of a personal data breach.",
+        "This Agreement is governed by the laws of England.",
+        "The processor shall notify the controller without undue delay after becoming aware of a personal data breach.",
+    ]
+    clauses = [
+        Clause(
+            clause_id=f"stub_{i:03d}",
+            text=text,
+            start_position=i * 100,
+            end_position=i * 100 + len(text)
+        )
+        for i, text in enumerate(texts)
+    ]
+    
+    batch = analyzer.analyze_clauses(clauses)
+    single = [analyzer.analyze_clause(clause) for clause in clauses]
+    
+    assert [a.clause_id for a in batch] == [c.clause_id for c in clauses]
+    for got, want in zip(batch, single):
+        assert got.clause_type == want.clause_type
+        assert got.confidence_score == want.confidence_score
+        assert got.alternative_types == want.alternative_types
+        assert (got.embeddings == want.embeddings).all()
+    
+    # Batch embeddings are row views of one matrix
+    assert all(a.embeddings.base is batch[0].embeddings.base for a in batch)
+    assert batch[0].embeddings.base.shape == (4, batch[0].embeddings.shape[0])
+    
+    summary = analyzer.get_analysis_summary(batch)
+    assert summary["total_clauses"] == 4
+    assert summary["avg_confidence"] == round(sum(a.confidence_score for a in batch) / 4, 3)
+    assert summary["low_confidence_count"] == len(analyzer.get_low_confidence_clauses(batch))
+    assert sum(summary["clause_type_distribution"].values()) == 4
+    assert list(summary["clause_type_distribution"]) == list(dict.fromkeys(a.clause_type for a in batch))
+    
+    print("✓ Batch vs single analysis test passed")
+
+
+def test_cache_dir_persists_embeddings():
+    """Test that cache_dir gives the default generator a per-model disk cache."""
+    print("\n=== Test 8: Persistent Embedding Cache (stub models) ===")
+    
+    clauses = [
+        Clause(clause_id="stub_001", text="Governing law", start_position=0, end_position=13),
+        Clause(clause_id="stub_002", text="The processor shall notify the controller.", start_position=13, end_position=55),
+    ]
+    
+    original_generator = nlp_analyzer_module.EmbeddingGenerator
+    nlp_analyzer_module.EmbeddingGenerator = _StubEmbeddingGenerator
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = NLPAnalyzer(classifier=_StubClassifier(), cache_dir=cache_dir)
+            first_run = first.analyze_clauses(clauses)
+            
+            second = NLPAnalyzer(classifier=_StubClassifier(), cache_dir=cache_dir)
+            second_run = second.analyze_clauses(clauses)
+            
+            assert second.embedding_generator.model.encoded == []
+            assert second.embedding_generator.cache_stats()['disk_hits'] == len(clauses)
+            for got, want in zip(second_run, first_run):
+                assert (got.embeddings == want.embeddings).all()
+            assert (Path(cache_dir) / "embeddings" / "all-MiniLM-L6-v2").is_dir()
+    finally:
+        nlp_analyzer_module.EmbeddingGenerator = original_generator
+    
+    print("✓ Persistent embedding cache test passed")
+
+
+def test_short_batch_results_fall_back_per_clause():
+    """Test that a batch call returning too few rows falls back to one at a time."""
+    print("\n=== Test 9: Short Batch Results (stub models) ===")
+    
+    analyzer = _stub_analyzer()
+    clauses = [
+        Clause(clause_id="short_001", text="The processor shall notify the controller of any breach.",
+               start_position=0, end_position=56),
+        Clause(clause_id="short_002", text="This Agreement is governed by the laws of England.",
+               start_position=57, end_position=107),
+    ]
+    analyzer.classifier.predict_batch = lambda texts: [analyzer.classifier.predict(texts[0])]
+    batch_embeddings = analyzer.embedding_generator.generate_embeddings_batch
+    analyzer.embedding_generator.generate_embeddings_batch = lambda texts, **kwargs: batch_embeddings(texts[:1], **kwargs)
+    
+    analyses = analyzer.analyze_clauses(clauses)
+    
+    assert [a.clause_id for a in analyses] == ["short_001", "short_002"]
+    for analysis, clause in zip(analyses, clauses):
+        assert analysis.clause_type == analyzer.classifier.predict(clause.text)[0]
+        assert (analysis.embeddings == analyzer.embedding_generator.generate_embedding(clause.text)).all()
+    
+    print("✓ Short batch results test passed")
+
+
 def main():
     """Run all tests."""
     print("=" * 60)
@@ -260,6 +373,9 @@ def main():
         test_clause_type_filtering()
         test_analysis_summary()
         test_error_handling()
+        test_batch_matches_single_analysis()
+        test_cache_dir_persists_embeddings()
+        test_short_batch_results_fall_back_per_clause()
         
         print("\n" + "=" * 60)
         print("✓ ALL TESTS PASSED")
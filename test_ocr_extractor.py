@@ -0,0 +1,278 @@
+"""
+Test script for OCRExtractor PDF page handling.
+Stubs out preprocessing and Tesseract so no Tesseract install is needed.
+"""
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cv2
+import numpy as np
+from reportlab.pdfgen import canvas
+
+import services.ocr_extractor as ocr_extractor_module
+from services.ocr_extractor import OCR_HIGH_RESOLUTION, OCR_RESOLUTION, OCRExtractor, OCRError
+
+
+def _write_pdf(path: Path, page_widths, font_size: int = 12):
+    """Write a PDF with one short line of text per page width (in points)."""
+    pdf = canvas.Canvas(str(path))
+    for width in page_widths:
+        pdf.setPageSize((width, 200))
+        pdf.setFont("Helvetica", font_size)
+        pdf.drawString(10, 100, f"Page {width}")
+        pdf.showPage()
+    pdf.save()
+
+
+class _StubOCRExtractor(OCRExtractor):
+    """OCRExtractor whose OCR reports the page width and finishes out of order."""
+
+    def __init__(self, **kwargs):
+        super().__init__(verify_installation=False, **kwargs)
+        self.ocr_calls = 0
+
+    def _preprocess_image(self, image):
+        return image[:, :, 0]
+
+    def _ocr_with_confidence(self, image):
+        self.ocr_calls += 1
+        width = image.shape[1]
+        # Wider (earlier) pages finish last
+        time.sleep(width / 20000)
+        if abs(width - 384 * OCR_RESOLUTION / 72) <= 2:
+            return "   ", 0.0
+        return f"page {width}", width / 1000
+
+
+def test_pdf_pages_keep_order():
+    """Concurrently OCR'd pages are joined in page order."""
+    print("\nTesting PDF OCR page order...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "scan.pdf"
+        # Pages narrow from first to last; the 384 pt page OCRs to blank
+        widths = [576, 480, 384, 288, 192, 96]
+        _write_pdf(pdf_path, widths)
+
+        extractor = _StubOCRExtractor()
+        text, confidence = extractor.extract_text_from_pdf(str(pdf_path))
+
+        # Each page is about width * DPI / 72 pixels wide
+        pixel_widths = [int(part.split()[1]) for part in text.split("\n\n")]
+        assert pixel_widths == sorted(pixel_widths, reverse=True)
+        for got, points in zip(pixel_widths, [576, 480, 288, 192, 96]):
+            assert abs(got - points * OCR_RESOLUTION / 72) <= 2
+        assert abs(confidence - sum(w / 1000 for w in pixel_widths) / len(pixel_widths)) < 1e-9
+        assert extractor.ocr_calls == len(widths)
+
+    print("✅ Pages joined in order")
+
+
+def test_small_print_rendered_at_high_resolution():
+    """Pages with small glyphs are re-rendered at the higher resolution."""
+    print("\nTesting small-print re-rendering...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "small.pdf"
+        _write_pdf(pdf_path, [576], font_size=5)
+
+        text, _ = _StubOCRExtractor().extract_text_from_pdf(str(pdf_path))
+        assert abs(int(text.split()[1]) - 576 * OCR_HIGH_RESOLUTION / 72) <= 2
+
+    print("✅ Small print re-rendered")
+
+
+def test_pdf_without_text_raises():
+    """A PDF whose pages yield no text raises OCRError."""
+    print("\nTesting PDF OCR with no text...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "blank.pdf"
+        _write_pdf(pdf_path, [384, 384])
+
+        try:
+            _StubOCRExtractor().extract_text_from_pdf(str(pdf_path))
+            assert False, "Should have raised OCRError"
+        except OCRError:
+            pass
+
+    print("✅ Empty OCR result rejected")
+
+
+def test_denoise_modes():
+    """Both denoise modes and the OpenCL path produce the same kind of page."""
+    print("\nTesting OCR denoise modes...")
+
+    rng = np.random.default_rng(0)
+    page = np.full((120, 200, 3), 255, dtype=np.uint8)
+    page[40:80, 20:180] = 0
+    speckles = rng.random(page.shape[:2]) < 0.02
+    page[speckles] = 0
+
+    for mode in ("fast", "nlm"):
+        extractor = OCRExtractor(verify_installation=False, denoise_mode=mode)
+        preprocessed = extractor._preprocess_image(page)
+        assert preprocessed.shape == page.shape[:2]
+        assert set(np.unique(preprocessed)) <= {0, 255}
+
+    # The UMat pipeline matches the host pipeline (UMat falls back to the
+    # CPU when no OpenCL device is present)
+    skewed = np.zeros((200, 300), dtype=np.uint8)
+    cv2.line(skewed, (30, 60), (270, 110), 255, 9)
+    host = OCRExtractor(verify_installation=False)
+    device = OCRExtractor(verify_installation=False)
+    device.use_gpu = True
+    assert np.array_equal(device._preprocess_image(skewed), host._preprocess_image(skewed))
+
+    try:
+        OCRExtractor(verify_installation=False, denoise_mode="gaussian")
+        assert False, "Should have raised ValueError"
+    except ValueError:
+        pass
+
+    print("✅ Denoise modes validated")
+
+
+def test_parse_ocr_data():
+    """Lines and average confidence are recovered from Tesseract word data."""
+    print("\nTesting OCR data parsing...")
+
+    ocr_data = {
+        "text": ["", "Data", "Processing", " ", "Agreement", "Article", "28", "  "],
+        "conf": [-1, 96, "90.5", -1, -1, 80, 70.5, -1],
+        "line_num": [0, 1, 1, 1, 2, 1, 1, 1],
+    }
+
+    text, confidence = OCRExtractor(verify_installation=False)._parse_ocr_data(ocr_data)
+
+    assert text == "Data Processing\nAgreement\nArticle 28"
+    assert abs(confidence - (96 + 90.5 + 80 + 70.5) / 4 / 100) < 1e-9
+
+    empty = {"text": ["", " "], "conf": [-1, -1], "line_num": [0, 0]}
+    assert OCRExtractor(verify_installation=False)._parse_ocr_data(empty) == ("", 0.0)
+
+    print("✅ OCR data parsed in one pass")
+
+
+class _FakeWordIterator:
+    """Stands in for a tesserocr ResultIterator positioned on one word."""
+
+    def __init__(self, lines):
+        self.words = [(text, conf, index == 0) for line in lines for index, (text, conf) in enumerate(line)]
+        self.position = 0
+
+    def GetUTF8Text(self, level):
+        return self.words[self.position][0]
+
+    def Confidence(self, level):
+        return self.words[self.position][1]
+
+    def IsAtBeginningOf(self, level):
+        return self.words[self.position][2]
+
+
+class _FakeTessBaseAPI:
+    """Stands in for tesserocr.PyTessBaseAPI."""
+
+    instances = 0
+    ended = 0
+    lines = [[("Data", 96.0), ("Processing", 90.5)], [("Agreement", 80.0)]]
+
+    def __init__(self, psm=None):
+        _FakeTessBaseAPI.instances += 1
+
+    def End(self):
+        _FakeTessBaseAPI.ended += 1
+
+    def SetImage(self, image):
+        self.image = image
+
+    def Recognize(self):
+        pass
+
+    def GetIterator(self):
+        return _FakeWordIterator(self.lines)
+
+
+def _fake_iterate_level(iterator, level):
+    for position in range(len(iterator.words)):
+        iterator.position = position
+        yield iterator
+
+
+def test_tesserocr_backend():
+    """The in-process backend feeds word data through the same parser."""
+    print("\nTesting tesserocr backend...")
+
+    fakes = {
+        "TESSEROCR_AVAILABLE": True,
+        "PyTessBaseAPI": _FakeTessBaseAPI,
+        "iterate_level": _fake_iterate_level,
+        "PSM": type("PSM", (), {"AUTO_OSD": 1}),
+        "RIL": type("RIL", (), {"WORD": 3, "TEXTLINE": 2}),
+    }
+    missing = object()
+    originals = {name: getattr(ocr_extractor_module, name, missing) for name in fakes}
+    for name, value in fakes.items():
+        setattr(ocr_extractor_module, name, value)
+    try:
+        extractor = OCRExtractor(verify_installation=False)
+        image = np.full((20, 40), 255, dtype=np.uint8)
+
+        text, confidence = extractor._ocr_with_confidence(image)
+        extractor._ocr_with_confidence(image)
+
+        assert text == "Data Processing\nAgreement"
+        assert abs(confidence - (96 + 90.5 + 80) / 3 / 100) < 1e-9
+        # One idle API is reused across pages and across threads
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pool.submit(extractor._ocr_with_confidence, image).result()
+        assert _FakeTessBaseAPI.instances == 1
+
+        extractor.close()
+        assert _FakeTessBaseAPI.ended == 1
+    finally:
+        for name, value in originals.items():
+            if value is missing:
+                delattr(ocr_extractor_module, name)
+            else:
+                setattr(ocr_extractor_module, name, value)
+
+    print("✅ tesserocr word data parsed")
+
+
+def run_all_tests():
+    """Run all OCR extractor tests."""
+    print("=" * 70)
+    print("OCR EXTRACTOR TESTS")
+    print("=" * 70)
+
+    try:
+        test_pdf_pages_keep_order()
+        test_small_print_rendered_at_high_resolution()
+        test_pdf_without_text_raises()
+        test_denoise_modes()
+        test_parse_ocr_data()
+        test_tesserocr_backend()
+
+        print("\n" + "=" * 70)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+"""
+Test script for PDFExtractor text extraction and cleaning.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from reportlab.pdfgen import canvas
+
+import services.pdf_extractor as pdf_extractor_module
+from services.pdf_extractor import PDFExtractor
+
+
+def _write_pdf(path: Path, pages):
+    """Write a PDF with one page per list of lines."""
+    pdf = canvas.Canvas(str(path))
+    for lines in pages:
+        for row, line in enumerate(lines):
+            pdf.drawString(72, 720 - 20 * row, line)
+        pdf.showPage()
+    pdf.save()
+
+
+def test_clean_text():
+    """Whitespace is normalized, empty lines dropped and artifacts removed."""
+    print("\nTesting PDF text cleaning...")
+
+    extractor = PDFExtractor()
+    raw = "  Article 28  \n\n\nThe   processor\tshall\x00 act\n\ufffd\n  only on instructions  "
+
+    assert extractor._clean_text(raw) == "Article 28\nThe processor shall act\nonly on instructions"
+    assert extractor._clean_text("") == ""
+
+    print("✅ Text cleaned")
+
+
+def test_pages_cleaned_while_streaming():
+    """Both extraction backends return text cleaned page by page."""
+    print("\nTesting streamed PDF page extraction...")
+
+    pages = [
+        ["DATA PROCESSING AGREEMENT", "1. The   Processor shall process Personal Data"],
+        ["2. The Processor shall notify the Controller of any breach"],
+        [],
+        ["3. Sub-processors require prior written authorization"],
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "contract.pdf"
+        _write_pdf(pdf_path, pages)
+
+        extractor = PDFExtractor()
+        expected = "\n".join(" ".join(line.split()) for lines in pages for line in lines)
+
+        assert extractor._extract_with_pdfplumber(pdf_path) == expected
+        assert extractor._extract_with_pypdf2(pdf_path) == expected
+        assert extractor.extract_text(str(pdf_path)) == expected
+
+    print("✅ Pages cleaned while streaming")
+
+
+def test_parallel_page_extraction_matches_serial():
+    """Extracting page ranges in worker processes keeps pages in order."""
+    print("\nTesting parallel PDF page extraction...")
+
+    pages = [[f"Clause {page}.{row}: the processor shall act on instructions" for row in range(3)]
+             for page in range(7)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "long.pdf"
+        _write_pdf(pdf_path, pages)
+
+        extractor = PDFExtractor()
+        serial = extractor._extract_with_pdfplumber(pdf_path)
+
+        original = (pdf_extractor_module.PDF_MAX_WORKERS, pdf_extractor_module.PARALLEL_MIN_PAGES)
+        pdf_extractor_module.PDF_MAX_WORKERS, pdf_extractor_module.PARALLEL_MIN_PAGES = 3, 2
+        try:
+            parallel = extractor._extract_with_pdfplumber(pdf_path)
+            # The worker pool is started once, without fork, and reused
+            executor = extractor._executor
+            assert executor._mp_context.get_start_method() == pdf_extractor_module.PDF_START_METHOD != "fork"
+            assert extractor._extract_with_pdfplumber(pdf_path) == parallel
+            assert extractor._executor is executor
+        finally:
+            pdf_extractor_module.PDF_MAX_WORKERS, pdf_extractor_module.PARALLEL_MIN_PAGES = original
+            extractor.close()
+
+        assert extractor._executor is None
+        assert parallel == serial
+        assert parallel.splitlines() == [line for lines in pages for line in lines]
+
+    print("✅ Parallel extraction matches serial extraction")
+
+
+def test_image_based_check_samples_leading_pages():
+    """Only the leading pages decide whether a PDF is image-based."""
+    print("\nTesting image-based PDF detection...")
+
+    text_page = ["The processor shall process personal data only on documented instructions",
+                 "from the controller, including transfers to a third country."]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        extractor = PDFExtractor()
+
+        text_pdf = Path(tmp) / "text.pdf"
+        _write_pdf(text_pdf, [text_page] + [[]] * 5)
+        assert extractor.is_image_based_pdf(str(text_pdf)) is False
+
+        blank_pdf = Path(tmp) / "scan.pdf"
+        _write_pdf(blank_pdf, [[]] * 5 + [text_page])
+        assert extractor.is_image_based_pdf(str(blank_pdf)) is True
+
+        corrupt_pdf = Path(tmp) / "corrupt.pdf"
+        corrupt_pdf.write_bytes(b"not a pdf")
+        assert extractor.is_image_based_pdf(str(corrupt_pdf)) is True
+
+    print("✅ Image-based detection samples leading pages")
+
+
+def run_all_tests():
+    """Run all PDF extractor tests."""
+    print("=" * 70)
+    print("PDF EXTRACTOR TESTS")
+    print("=" * 70)
+
+    try:
+        test_clean_text()
+        test_pages_cleaned_while_streaming()
+        test_parallel_page_extraction_matches_serial()
+        test_image_based_check_samples_leading_pages()
+
+        print("\n" + "=" * 70)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -92,6 +92,88 @@ def test_prompt_builder():
     assert "Article 28" in context
     print("✓ Regulatory context generated successfully")
     
+    # Test static prompt prefixes
+    print("\n5. Testing cacheable prompt prefixes...")
+    prefix = builder.get_cacheable_prefix('recommendation', 'GDPR')
+    other_prompt = builder.build_recommendation_prompt(clause, requirement, ["Different issue"])
+    assert rec_prompt.startswith(prefix) and other_prompt.startswith(prefix)
+    assert "GDPR Article 28" not in prefix
+    assert clause.clause_text not in prefix
+    assert rec_prompt.endswith("RECOMMENDATION:")
+    assert mod_prompt.startswith(builder.get_cacheable_prefix('modification', 'GDPR'))
+    assert gen_prompt.startswith(builder.get_cacheable_prefix('generation', 'GDPR'))
+    assert builder.get_cacheable_prefix('recommendation', 'HIPAA') != prefix
+    print("✓ Prompts share a static prefix per type and framework")
+    
+    # Test prompt module registry
+    print("\n6. Testing prompt modules...")
+    modules = builder.build_recommendation_prompt(clause, requirement, issues, as_modules=True)
+    assert builder.render(modules) == rec_prompt
+    assert [module_id for module_id, _ in modules] == [
+        "persona_recommendation_GDPR", "task_recommendation", None, "cue_recommendation"
+    ]
+    assert all(builder.modules[module_id] == text for module_id, text in modules if module_id)
+    analysis_modules = builder.build_compliance_analysis_prompt(
+        clause.clause_text, "GDPR", [requirement], as_modules=True
+    )
+    assert analysis_modules[1][0] == "task_compliance_analysis_GDPR"
+    print("✓ Prompt modules render to the same prompt")
+    
+    # Test cached formatting
+    print("\n7. Testing cached mandatory elements and context blocks...")
+    assert builder.build_regulatory_context_injection(requirement) is context
+    assert requirement.formatted_mandatory_elements == (
+        "  • Processing only on documented instructions\n"
+        "  • Confidentiality obligations\n"
+        "  • Security measures"
+    )
+    assert requirement.formatted_mandatory_elements in rec_prompt
+    no_elements = RegulatoryRequirement(
+        requirement_id="GDPR_TEST", framework="GDPR", article_reference="GDPR Article 5",
+        clause_type="Other", description="Principles", mandatory=False
+    )
+    assert no_elements.formatted_mandatory_elements == "None specified"
+    print("✓ Formatted blocks reused")
+
+    # Test validation and stats
+    print("\n8. Testing prompt validation and stats...")
+    valid, stats = builder.validate_and_stats(rec_prompt)
+    assert valid == builder.validate_prompt(rec_prompt)
+    assert stats == builder.get_prompt_stats(rec_prompt)
+    assert stats['words'] == len(rec_prompt.split())
+    assert builder.validate_and_stats("a b\nc", max_length=3) == (
+        False, {'length': 5, 'lines': 2, 'words': 3, 'estimated_tokens': 3 * 1.3}
+    )
+    mask = builder.validate_prompts_batch(["ok", "too long", ""], max_length=4)
+    assert mask.tolist() == [True, False, True]
+    assert builder.validate_prompts_batch([]).shape == (0,)
+    print("✓ Prompts validated in batch")
+
+    # Test batched builders
+    print("\n9. Testing batched prompt builders...")
+    hipaa = RegulatoryRequirement(
+        requirement_id="HIPAA_BAA_01", framework="HIPAA", article_reference="45 CFR 164.504(e)",
+        clause_type="Data Processing", description="Business associate safeguards", mandatory=True
+    )
+    triples = [(clause, requirement, issues), (clause, hipaa, []), (clause, requirement, ["Different issue"])]
+    assert builder.build_recommendation_prompts(triples) == [
+        builder.build_recommendation_prompt(*triple) for triple in triples
+    ]
+    assert builder.build_modification_prompts(triples) == [
+        builder.build_modification_prompt(*triple) for triple in triples
+    ]
+    items = [(clause.clause_text, "GDPR", [requirement]), ("Other clause", "HIPAA", [hipaa, requirement])]
+    assert builder.build_compliance_analysis_prompts(items) == [
+        builder.build_compliance_analysis_prompt(*item) for item in items
+    ]
+    assert builder.build_recommendation_prompts([]) == []
+    # Framework labels are interned, so requirements share one string object
+    assert hipaa.framework is RegulatoryRequirement(
+        requirement_id="HIPAA_X", framework="".join(["HIP", "AA"]), article_reference="x",
+        clause_type="Other", description="x", mandatory=False
+    ).framework
+    print("✓ Batched prompts match single prompts")
+
     print("\n✓ All PromptBuilder tests passed!")
 
 